@@ -2,8 +2,106 @@
 Implementação do modelo Black-Scholes analítico
 Inclui precificação de opções e cálculo das gregas
 """
+import functools
+import math
+from collections import namedtuple
+
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
+
+# Constantes da distribuição normal padrão (caminho escalar)
+_INV_SQRT2 = 1.0 / math.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+def _ncdf(x):
+    """CDF da normal padrão para escalares, via math.erf (sem overhead do SciPy)"""
+    return 0.5 * (1.0 + math.erf(x * _INV_SQRT2))
+
+
+def _npdf(x):
+    """PDF da normal padrão para escalares"""
+    return _INV_SQRT_2PI * math.exp(-0.5 * x * x)
+
+
+# Termos compartilhados por preços e gregas (caminho escalar)
+_TermosComuns = namedtuple('_TermosComuns', [
+    'd1', 'd2', 'raiz_T', 'desconto',
+    'N_d1', 'N_d2', 'N_menos_d1', 'N_menos_d2', 'n_d1'
+])
+
+# Funções puras com memoização: a GUI reprecifica com frequência os mesmos
+# parâmetros (obter_resumo, cliques repetidos em "Calcular")
+_TAMANHO_CACHE = 2048
+
+
+@functools.lru_cache(maxsize=_TAMANHO_CACHE)
+def _termos_comuns(S, K, T, r, sigma):
+    """
+    Calcula uma única vez os termos compartilhados por preços e gregas
+    
+    Usa N(-x) = 1 - N(x) para evitar avaliações extras da CDF.
+    """
+    raiz_T = math.sqrt(T)
+    sigma_raiz_T = sigma * raiz_T
+    
+    d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / sigma_raiz_T
+    d2 = d1 - sigma_raiz_T
+    
+    N_d1 = _ncdf(d1)
+    N_d2 = _ncdf(d2)
+    
+    return _TermosComuns(
+        d1=d1,
+        d2=d2,
+        raiz_T=raiz_T,
+        desconto=math.exp(-r * T),
+        N_d1=N_d1,
+        N_d2=N_d2,
+        N_menos_d1=1.0 - N_d1,
+        N_menos_d2=1.0 - N_d2,
+        n_d1=_npdf(d1)
+    )
+
+
+@functools.lru_cache(maxsize=_TAMANHO_CACHE)
+def _precos(S, K, T, r, sigma):
+    """Retorna (preço call, preço put) para os parâmetros dados"""
+    termos = _termos_comuns(S, K, T, r, sigma)
+    K_desc = K * termos.desconto
+    
+    preco_call = S * termos.N_d1 - K_desc * termos.N_d2
+    preco_put = K_desc * termos.N_menos_d2 - S * termos.N_menos_d1
+    return preco_call, preco_put
+
+
+@functools.lru_cache(maxsize=_TAMANHO_CACHE)
+def _gregas(S, K, T, r, sigma, eh_call):
+    """Retorna (delta, gamma, vega, theta, rho) para os parâmetros dados"""
+    termos = _termos_comuns(S, K, T, r, sigma)
+    
+    raiz_T = termos.raiz_T
+    K_desc = K * termos.desconto
+    n_d1 = termos.n_d1
+    
+    termo1_theta = -(S * n_d1 * sigma) / (2 * raiz_T)
+    
+    if eh_call:
+        delta = termos.N_d1
+        termo2_theta = -r * K_desc * termos.N_d2
+        rho = K_desc * T * termos.N_d2
+    else:
+        delta = termos.N_d1 - 1
+        termo2_theta = r * K_desc * termos.N_menos_d2
+        rho = -K_desc * T * termos.N_menos_d2
+    
+    return (
+        delta,
+        n_d1 / (S * sigma * raiz_T),
+        S * n_d1 * raiz_T / 100,
+        (termo1_theta + termo2_theta) / 365,
+        rho / 100
+    )
 
 
 class ModeloBlackScholes:
@@ -44,6 +142,11 @@ class ModeloBlackScholes:
         if self.volatilidade <= 0:
             raise ValueError("Volatilidade deve ser positiva")
     
+    def _parametros(self):
+        """Tupla (S, K, T, r, σ) usada como chave das funções memoizadas"""
+        return (self.preco_ativo, self.preco_strike, self.tempo_maturidade,
+                self.taxa_juros, self.volatilidade)
+    
     def calcular_d1_d2(self):
         """
         Calcula os parâmetros d1 e d2 da fórmula de Black-Scholes
@@ -51,16 +154,8 @@ class ModeloBlackScholes:
         d1 = (ln(S/K) + (r + σ²/2)T) / (σ√T)
         d2 = d1 - σ√T
         """
-        S = self.preco_ativo
-        K = self.preco_strike
-        T = self.tempo_maturidade
-        r = self.taxa_juros
-        sigma = self.volatilidade
-        
-        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
-        
-        return d1, d2
+        termos = _termos_comuns(*self._parametros())
+        return termos.d1, termos.d2
     
     def calcular_preco_call(self):
         """
@@ -68,14 +163,7 @@ class ModeloBlackScholes:
         
         C = S·N(d1) - K·e^(-rT)·N(d2)
         """
-        d1, d2 = self.calcular_d1_d2()
-        
-        S = self.preco_ativo
-        K = self.preco_strike
-        T = self.tempo_maturidade
-        r = self.taxa_juros
-        
-        preco_call = S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+        preco_call, _ = _precos(*self._parametros())
         return preco_call
     
     def calcular_preco_put(self):
@@ -84,14 +172,7 @@ class ModeloBlackScholes:
         
         P = K·e^(-rT)·N(-d2) - S·N(-d1)
         """
-        d1, d2 = self.calcular_d1_d2()
-        
-        S = self.preco_ativo
-        K = self.preco_strike
-        T = self.tempo_maturidade
-        r = self.taxa_juros
-        
-        preco_put = K * np.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
+        _, preco_put = _precos(*self._parametros())
         return preco_put
     
     def calcular_delta(self, tipo_opcao='call'):
@@ -101,12 +182,7 @@ class ModeloBlackScholes:
         Delta_call = N(d1)
         Delta_put = N(d1) - 1
         """
-        d1, _ = self.calcular_d1_d2()
-        
-        if tipo_opcao.lower() == 'call':
-            return norm.cdf(d1)
-        else:
-            return norm.cdf(d1) - 1
+        return self.calcular_todas_gregas(tipo_opcao)['delta']
     
     def calcular_gamma(self):
         """
@@ -114,28 +190,16 @@ class ModeloBlackScholes:
         
         Gamma = N'(d1) / (S·σ·√T)
         """
-        d1, _ = self.calcular_d1_d2()
-        
-        S = self.preco_ativo
-        sigma = self.volatilidade
-        T = self.tempo_maturidade
-        
-        gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
-        return gamma
+        return self.calcular_todas_gregas()['gamma']
     
     def calcular_vega(self):
         """
         Calcula Vega: sensibilidade à volatilidade
         
         Vega = S·N'(d1)·√T
+        Dividido por 100 para representar mudança de 1%
         """
-        d1, _ = self.calcular_d1_d2()
-        
-        S = self.preco_ativo
-        T = self.tempo_maturidade
-        
-        vega = S * norm.pdf(d1) * np.sqrt(T)
-        return vega / 100  # Dividido por 100 para representar mudança de 1%
+        return self.calcular_todas_gregas()['vega']
     
     def calcular_theta(self, tipo_opcao='call'):
         """
@@ -143,24 +207,9 @@ class ModeloBlackScholes:
         
         Theta_call = -S·N'(d1)·σ/(2√T) - r·K·e^(-rT)·N(d2)
         Theta_put = -S·N'(d1)·σ/(2√T) + r·K·e^(-rT)·N(-d2)
+        Dividido por 365 para representar decaimento diário
         """
-        d1, d2 = self.calcular_d1_d2()
-        
-        S = self.preco_ativo
-        K = self.preco_strike
-        T = self.tempo_maturidade
-        r = self.taxa_juros
-        sigma = self.volatilidade
-        
-        termo1 = -(S * norm.pdf(d1) * sigma) / (2 * np.sqrt(T))
-        
-        if tipo_opcao.lower() == 'call':
-            termo2 = -r * K * np.exp(-r * T) * norm.cdf(d2)
-        else:
-            termo2 = r * K * np.exp(-r * T) * norm.cdf(-d2)
-        
-        theta = termo1 + termo2
-        return theta / 365  # Dividido por 365 para representar decaimento diário
+        return self.calcular_todas_gregas(tipo_opcao)['theta']
     
     def calcular_rho(self, tipo_opcao='call'):
         """
@@ -168,28 +217,20 @@ class ModeloBlackScholes:
         
         Rho_call = K·T·e^(-rT)·N(d2)
         Rho_put = -K·T·e^(-rT)·N(-d2)
+        Dividido por 100 para representar mudança de 1%
         """
-        _, d2 = self.calcular_d1_d2()
-        
-        K = self.preco_strike
-        T = self.tempo_maturidade
-        r = self.taxa_juros
-        
-        if tipo_opcao.lower() == 'call':
-            rho = K * T * np.exp(-r * T) * norm.cdf(d2)
-        else:
-            rho = -K * T * np.exp(-r * T) * norm.cdf(-d2)
-        
-        return rho / 100  # Dividido por 100 para representar mudança de 1%
+        return self.calcular_todas_gregas(tipo_opcao)['rho']
     
     def calcular_todas_gregas(self, tipo_opcao='call'):
-        """Calcula todas as gregas de uma vez"""
+        """Calcula todas as gregas de uma vez, avaliando d1/d2 e N(·) uma só vez"""
+        delta, gamma, vega, theta, rho = _gregas(*self._parametros(),
+                                                 tipo_opcao.lower() == 'call')
         return {
-            'delta': self.calcular_delta(tipo_opcao),
-            'gamma': self.calcular_gamma(),
-            'vega': self.calcular_vega(),
-            'theta': self.calcular_theta(tipo_opcao),
-            'rho': self.calcular_rho(tipo_opcao)
+            'delta': delta,
+            'gamma': gamma,
+            'vega': vega,
+            'theta': theta,
+            'rho': rho
         }
     
     def calcular_superficie_precos(self, precos_ativos, tempos, tipo_opcao='call'):
@@ -204,26 +245,12 @@ class ModeloBlackScholes:
         Returns:
             Matriz de preços (len(tempos) x len(precos_ativos))
         """
-        S_original = self.preco_ativo
-        T_original = self.tempo_maturidade
-        
-        superficie = np.zeros((len(tempos), len(precos_ativos)))
+        # Broadcast: linhas = tempos, colunas = preços do ativo
+        S = np.asarray(precos_ativos, dtype=float)[None, :]
+        T = np.asarray(tempos, dtype=float)[:, None]
         
-        for i, t in enumerate(tempos):
-            for j, s in enumerate(precos_ativos):
-                self.preco_ativo = s
-                self.tempo_maturidade = t
-                
-                if tipo_opcao.lower() == 'call':
-                    superficie[i, j] = self.calcular_preco_call()
-                else:
-                    superficie[i, j] = self.calcular_preco_put()
-        
-        # Restaura valores originais
-        self.preco_ativo = S_original
-        self.tempo_maturidade = T_original
-        
-        return superficie
+        return _precos_vetorizados(S, self.preco_strike, T, self.taxa_juros,
+                                   self.volatilidade, tipo_opcao)
     
     def validar_paridade_put_call(self):
         """
@@ -236,19 +263,22 @@ class ModeloBlackScholes:
         preco_put = self.calcular_preco_put()
         
         lado_esquerdo = preco_call - preco_put
-        lado_direito = (self.preco_ativo - 
-                       self.preco_strike * np.exp(-self.taxa_juros * self.tempo_maturidade))
+        desconto = _termos_comuns(*self._parametros()).desconto
+        lado_direito = self.preco_ativo - self.preco_strike * desconto
         
         diferenca = abs(lado_esquerdo - lado_direito)
         return diferenca
     
     def obter_resumo(self):
         """Retorna um resumo completo dos cálculos"""
-        preco_call = self.calcular_preco_call()
-        preco_put = self.calcular_preco_put()
+        # Termos comuns calculados (e memoizados) uma única vez
+        preco_call, preco_put = _precos(*self._parametros())
         gregas_call = self.calcular_todas_gregas('call')
         gregas_put = self.calcular_todas_gregas('put')
-        paridade = self.validar_paridade_put_call()
+        
+        desconto = _termos_comuns(*self._parametros()).desconto
+        lado_direito = self.preco_ativo - self.preco_strike * desconto
+        paridade = abs((preco_call - preco_put) - lado_direito)
         
         return {
             'parametros': {
@@ -283,6 +313,202 @@ def calcular_preco_put(S, K, T, r, sigma):
     return modelo.calcular_preco_put()
 
 
+def _precos_vetorizados(S, K, T, r, sigma, tipo_opcao='call'):
+    """
+    Preço de Black-Scholes com broadcast NumPy entre S e T
+    
+    Pontos com T <= 0 recebem o payoff no vencimento, sem passar pelo
+    polo de 1/√T.
+    """
+    eh_call = tipo_opcao.lower() == 'call'
+    vencido = T <= 0
+    
+    # O polo em T = 0 é tratado pelo np.where abaixo
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raiz_T = np.sqrt(T)
+        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * raiz_T)
+        d2 = d1 - sigma * raiz_T
+        K_desc = K * np.exp(-r * T)
+        
+        if eh_call:
+            precos = S * ndtr(d1) - K_desc * ndtr(d2)
+        else:
+            precos = K_desc * ndtr(-d2) - S * ndtr(-d1)
+    
+    if not np.any(vencido):
+        return precos
+    
+    payoff = np.maximum(S - K, 0.0) if eh_call else np.maximum(K - S, 0.0)
+    return np.where(vencido, payoff, precos)
+
+
+def gregas_vetorizadas(S, K, T, r, sigma, tipo_opcao='call'):
+    """
+    Calcula todas as gregas para um array de preços do ativo de uma só vez
+    
+    Args:
+        S: Array de preços do ativo
+        K, T, r, sigma: Parâmetros escalares do modelo
+        tipo_opcao: 'call' ou 'put'
+    
+    Returns:
+        Dicionário {'delta', 'gamma', 'vega', 'theta', 'rho'} de arrays NumPy
+    """
+    S = np.asarray(S, dtype=float)
+    
+    # Invariantes escalares: math evita o despacho de ufuncs do NumPy
+    raiz_T = math.sqrt(T)
+    sigma_raiz_T = sigma * raiz_T
+    K_desc = K * math.exp(-r * T)
+    
+    d1 = (np.log(S / K) + (r + 0.5 * sigma * sigma) * T) / sigma_raiz_T
+    d2 = d1 - sigma_raiz_T
+    
+    N_d1 = ndtr(d1)
+    n_d1 = _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)
+    
+    termo1_theta = -(S * n_d1 * sigma) / (2 * raiz_T)
+    
+    if tipo_opcao.lower() == 'call':
+        N_d2 = ndtr(d2)
+        delta = N_d1
+        termo2_theta = -r * K_desc * N_d2
+        rho = K_desc * T * N_d2
+    else:
+        N_menos_d2 = ndtr(-d2)
+        delta = N_d1 - 1
+        termo2_theta = r * K_desc * N_menos_d2
+        rho = -K_desc * T * N_menos_d2
+    
+    return {
+        'delta': delta,
+        'gamma': n_d1 / (S * sigma_raiz_T),
+        'vega': S * n_d1 * raiz_T / 100,
+        'theta': (termo1_theta + termo2_theta) / 365,
+        'rho': rho / 100
+    }
+
+
+def volatilidade_implicita(preco_opcao, S, K, T, r, tipo_opcao='call',
+                           tolerancia=1e-10, max_iteracoes=100):
+    """
+    Inverte a fórmula de Black-Scholes para obter a volatilidade implícita
+    
+    A inversão é feita sobre o valor no tempo (preço menos o valor intrínseco
+    descontado), precificado pela opção fora do dinheiro com o mesmo strike,
+    o que evita a perda de precisão da paridade put-call nas asas. Parte da
+    aproximação fechada de Corrado-Miller (ou do ponto de inflexão de
+    Manaster-Koehler onde ela não é válida) e refina com passos de Newton
+    vetorizados sobre toda a cadeia de opções de uma só vez, aplicados ao
+    logaritmo do preço (quase linear em sigma nas asas, onde o preço cai
+    exponencialmente e o Newton direto avança devagar). Cada entrada
+    mantém um intervalo [baixo, alto] que contém a raiz; passos de Newton que
+    saem dele (vega muito pequena ou chute além da inflexão) viram bisseção.
+    
+    O critério de parada é o erro em sigma (erro no preço dividido pela vega),
+    somado ao ruído de arredondamento do preço: onde o preço quase não varia
+    com sigma (opções muito fora do dinheiro, ou muito dentro dele com valor
+    no tempo abaixo da precisão do preço), sigma não fica determinado e o
+    resultado é NaN em vez de um valor qualquer.
+    
+    Args:
+        preco_opcao: Preço(s) de mercado da opção
+        S, K, T, r: Parâmetros do modelo (escalares ou arrays com broadcast)
+        tipo_opcao: 'call' ou 'put'
+        tolerancia: Erro máximo em sigma
+        max_iteracoes: Limite de passos de Newton/bisseção
+    
+    Returns:
+        Array de volatilidades; NaN onde o preço viola os limites de arbitragem,
+        onde T <= 0 ou onde sigma não foi determinado dentro da tolerância
+    """
+    preco_opcao, S, K, T = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (preco_opcao, S, K, T)))
+    
+    K_desc = K * np.exp(-r * T)
+    
+    # Valor no tempo; a opção fora do dinheiro é a call quando S < K_desc
+    if tipo_opcao.lower() == 'call':
+        valor_tempo = preco_opcao - np.maximum(S - K_desc, 0.0)
+    else:
+        valor_tempo = preco_opcao - np.maximum(K_desc - S, 0.0)
+    otm_call = S < K_desc
+    
+    valido = (T > 0) & (valor_tempo > 0) & (valor_tempo < np.where(otm_call, S, K_desc))
+    
+    # Erro de arredondamento do preço recebido, herdado pelo valor no tempo;
+    # abaixo do menor float normal a precisão relativa se perde
+    ruido_entrada = 4 * np.finfo(float).eps * np.abs(preco_opcao) + np.finfo(float).tiny
+    
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        raiz_T = np.sqrt(T)
+        
+        def preco_otm(sigma):
+            """Preço da opção fora do dinheiro, d1 e a soma dos módulos dos termos"""
+            sigma_raiz_T = sigma * raiz_T
+            d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / sigma_raiz_T
+            d2 = d1 - sigma_raiz_T
+            termo_S = S * ndtr(np.where(otm_call, d1, -d1))
+            termo_K = K_desc * ndtr(np.where(otm_call, d2, -d2))
+            preco = np.where(otm_call, termo_S - termo_K, termo_K - termo_S)
+            return preco, d1, termo_S + termo_K
+        
+        # Intervalo inicial: o preço cresce com sigma, de 0 (sigma -> 0) até
+        # S ou K_desc (sigma -> inf); o limite alto é dobrado até passar do alvo
+        baixo = np.zeros_like(valor_tempo)
+        alto = np.ones_like(valor_tempo)
+        for _ in range(64):
+            abaixo = valido & (preco_otm(alto)[0] < valor_tempo)
+            if not abaixo.any():
+                break
+            baixo = np.where(abaixo, alto, baixo)
+            alto = np.where(abaixo, 2 * alto, alto)
+        
+        # Chute inicial de Corrado-Miller, sobre o preço da call equivalente
+        C = valor_tempo + np.maximum(S - K_desc, 0.0)
+        meio = C - 0.5 * (S - K_desc)
+        discriminante = np.maximum(meio**2 - (S - K_desc)**2 / np.pi, 0.0)
+        sigma = (np.sqrt(2 * np.pi / T) / (S + K_desc)) * (meio + np.sqrt(discriminante))
+        
+        # Ponto de inflexão de Manaster-Koehler onde Corrado-Miller não vale
+        sigma_mk = np.sqrt(2 * np.abs(np.log(S / K) + r * T) / T)
+        usar_mk = ~np.isfinite(sigma) | (sigma <= 0)
+        sigma = np.where(usar_mk, sigma_mk, sigma)
+        fora = ~((sigma > baixo) & (sigma < alto))
+        sigma = np.where(fora, 0.5 * (baixo + alto), sigma)
+        
+        def avaliar(sigma):
+            """Preço, diferença ao alvo, vega, ruído do preço e convergência"""
+            preco, d1, magnitude = preco_otm(sigma)
+            diferenca = preco - valor_tempo
+            vega = S * _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1) * raiz_T
+            ruido = 4 * np.finfo(float).eps * magnitude + ruido_entrada
+            convergiu = np.abs(diferenca) + ruido < tolerancia * vega
+            return preco, diferenca, vega, ruido, convergiu
+        
+        for _ in range(max_iteracoes):
+            preco, diferenca, vega, ruido, convergiu = avaliar(sigma)
+            # Preço no alvo a menos do ruído sem convergir: sigma não é
+            # determinado pelo preço e a entrada para de iterar
+            parado = convergiu | (np.abs(diferenca) <= ruido)
+            if np.all(parado[valido]):
+                break
+            
+            # Preço acima do alvo: a raiz está abaixo de sigma (e vice-versa)
+            alto = np.where(diferenca > 0, sigma, alto)
+            baixo = np.where(diferenca < 0, sigma, baixo)
+            
+            # Newton em log(preço): d log(preço) / d sigma = vega / preço
+            newton = sigma - np.log(preco / valor_tempo) * preco / vega
+            dentro = np.isfinite(newton) & (newton > baixo) & (newton < alto)
+            sigma = np.where(parado, sigma,
+                             np.where(dentro, newton, 0.5 * (baixo + alto)))
+        else:
+            convergiu = avaliar(sigma)[4]
+    
+    return np.where(valido & convergiu, sigma, np.nan)
+
+
 if __name__ == "__main__":
     # Teste do modelo
     print("🧮 Testando Modelo Black-Scholes\n")
@@ -312,3 +538,25 @@ if __name__ == "__main__":
     
     print(f"\nParidade Put-Call (erro): {resumo['paridade_put_call']:.10f}")
     print("✅ Modelo validado!" if resumo['paridade_put_call'] < 1e-10 else "⚠️  Verificar paridade")
+    
+    # Volatilidade implícita: ida e volta em uma cadeia com asas profundas
+    # (K = 300 e K = 150 fora do dinheiro com sigma baixo) e consistência call/put
+    strikes = np.array([20.0, 60.0, 100.0, 110.0, 150.0, 300.0])
+    sigmas = np.array([0.05, 0.2, 0.8])[:, None]
+    vols = {}
+    for tipo in ('call', 'put'):
+        precos = _precos_vetorizados(100.0, strikes, 1.0, 0.05, sigmas, tipo)
+        vols[tipo] = volatilidade_implicita(precos, 100.0, strikes, 1.0, 0.05, tipo)
+    
+    identificadas = {tipo: np.isfinite(v) for tipo, v in vols.items()}
+    erro_ida_volta = max(np.max(np.abs(v - sigmas)[identificadas[tipo]])
+                         for tipo, v in vols.items())
+    ambas = identificadas['call'] & identificadas['put']
+    erro_call_put = np.max(np.abs(vols['call'] - vols['put'])[ambas])
+    
+    print(f"\nVolatilidade implícita (erro ida e volta): {erro_ida_volta:.2e}")
+    print(f"Volatilidade implícita (call x put): {erro_call_put:.2e}")
+    asas_ok = np.all(identificadas['call'][:, strikes >= 150])
+    print("✅ Volatilidade implícita validada!"
+          if erro_ida_volta < 1e-9 and erro_call_put < 1e-9 and asas_ok
+          else "⚠️  Verificar volatilidade implícita")
@@ -0,0 +1,148 @@
+"""
+Precificação Black-Scholes em lote compilada com Numba
+Usada nas comparações entre o modelo analítico e a PINN
+
+Os kernels usam cache=True: a compilação LLVM acontece uma única vez e
+as execuções seguintes carregam o código do cache em disco.
+"""
+import math
+
+import numpy as np
+from numba import njit, prange
+
+_INV_SQRT2 = 1.0 / math.sqrt(2.0)
+
+
+@njit(fastmath=True, cache=True)
+def _ncdf(x):
+    """CDF da normal padrão (escalar, compilada)"""
+    return 0.5 * (1.0 + math.erf(x * _INV_SQRT2))
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _precificar_kernel(S, T, K, r, sigma, eh_call, saida):
+    """
+    Preenche `saida` com o preço de Black-Scholes de cada par (S[i], T[i])
+
+    Para T[i] <= 0 devolve o payoff no vencimento.
+    """
+    for i in prange(S.size):
+        s = S[i]
+        t = T[i]
+
+        if t <= 0.0:
+            if eh_call:
+                saida[i] = max(s - K, 0.0)
+            else:
+                saida[i] = max(K - s, 0.0)
+            continue
+
+        sigma_raiz_t = sigma * math.sqrt(t)
+        d1 = (math.log(s / K) + (r + 0.5 * sigma * sigma) * t) / sigma_raiz_t
+        d2 = d1 - sigma_raiz_t
+        K_desc = K * math.exp(-r * t)
+
+        if eh_call:
+            saida[i] = s * _ncdf(d1) - K_desc * _ncdf(d2)
+        else:
+            saida[i] = K_desc * _ncdf(-d2) - s * _ncdf(-d1)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _superficie_kernel(S, T, K, r, sigma, eh_call, saida):
+    """
+    Preenche `saida[j, i]` com o preço para o par (S[i], T[j])
+
+    Paraleliza sobre as linhas (tempos); raiz de T e desconto do strike
+    são calculados uma vez por linha.
+    """
+    for j in prange(T.size):
+        t = T[j]
+
+        if t <= 0.0:
+            for i in range(S.size):
+                if eh_call:
+                    saida[j, i] = max(S[i] - K, 0.0)
+                else:
+                    saida[j, i] = max(K - S[i], 0.0)
+            continue
+
+        sigma_raiz_t = sigma * math.sqrt(t)
+        deriva = (r + 0.5 * sigma * sigma) * t
+        K_desc = K * math.exp(-r * t)
+
+        for i in range(S.size):
+            s = S[i]
+            d1 = (math.log(s / K) + deriva) / sigma_raiz_t
+            d2 = d1 - sigma_raiz_t
+
+            if eh_call:
+                saida[j, i] = s * _ncdf(d1) - K_desc * _ncdf(d2)
+            else:
+                saida[j, i] = K_desc * _ncdf(-d2) - s * _ncdf(-d1)
+
+
+def precificar_lote(S, K, T, r, sigma, tipo_opcao='call'):
+    """
+    Precifica um lote de opções de uma só vez
+
+    Args:
+        S: Array (ou escalar) de preços do ativo
+        K: Preço strike
+        T: Array (ou escalar) de tempos até maturidade, com broadcast contra S
+        r: Taxa livre de risco
+        sigma: Volatilidade
+        tipo_opcao: 'call' ou 'put'
+
+    Returns:
+        Array de preços com o formato de broadcast de S e T
+    """
+    S = np.asarray(S, dtype=np.float64)
+    T = np.asarray(T, dtype=np.float64)
+    formato = np.broadcast_shapes(S.shape, T.shape)
+
+    S_flat = np.ascontiguousarray(np.broadcast_to(S, formato)).ravel()
+    T_flat = np.ascontiguousarray(np.broadcast_to(T, formato)).ravel()
+    saida = np.empty(S_flat.size, dtype=np.float64)
+
+    _precificar_kernel(S_flat, T_flat, float(K), float(r), float(sigma),
+                       tipo_opcao.lower() == 'call', saida)
+
+    return saida.reshape(formato)
+
+
+def precificar_superficie(S_vec, T_vec, K, r, sigma, tipo_opcao='call'):
+    """
+    Precifica a grade completa S x T sem montar as malhas
+
+    Args:
+        S_vec: Vetor de preços do ativo (colunas)
+        T_vec: Vetor de tempos até maturidade (linhas)
+        K: Preço strike
+        r: Taxa livre de risco
+        sigma: Volatilidade
+        tipo_opcao: 'call' ou 'put'
+
+    Returns:
+        Array (len(T_vec), len(S_vec)), no mesmo formato de np.meshgrid(S_vec, T_vec)
+    """
+    S_vec = np.ascontiguousarray(S_vec, dtype=np.float64).ravel()
+    T_vec = np.ascontiguousarray(T_vec, dtype=np.float64).ravel()
+    saida = np.empty((T_vec.size, S_vec.size), dtype=np.float64)
+
+    _superficie_kernel(S_vec, T_vec, float(K), float(r), float(sigma),
+                       tipo_opcao.lower() == 'call', saida)
+
+    return saida
+
+
+def aquecer():
+    """
+    Compila (ou carrega do cache) os kernels com uma chamada mínima
+
+    Deve ser executada fora da thread da interface para que o primeiro
+    uso real não trave o loop de eventos do Tk.
+    """
+    precificar_lote(np.array([100.0]), 100.0, 1.0, 0.05, 0.2, 'call')
+    precificar_lote(np.array([100.0]), 100.0, 1.0, 0.05, 0.2, 'put')
+    precificar_superficie(np.array([100.0]), np.array([1.0]), 100.0, 0.05, 0.2)
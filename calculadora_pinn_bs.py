@@ -2,13 +2,15 @@ import customtkinter as ctk
 from tkinter import messagebox
 import threading
 import numpy as np
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
 from PIL import Image, ImageTk
 import os
 
 # Importações locais
-from black_scholes import ModeloBlackScholes
+from black_scholes import ModeloBlackScholes, gregas_vetorizadas
+import black_scholes_numba
+from black_scholes_numba import precificar_lote, precificar_superficie
 from modelo_pinn import RedeNeuralPINN
 from visualizacoes import Visualizador
 from equacoes_latex import GeradorEquacoes
@@ -35,7 +37,9 @@ class CalculadoraPINNApp(ctk.CTk):
         
         # Variáveis de Estado
         self.treinamento_em_andamento = False
+        self.visualizacao_em_andamento = False
         self.pinn_treinada = False
+        self.ultimos_parametros_calc = None
         
         # Configuração do Layout
         self.grid_columnconfigure(1, weight=1)
@@ -49,6 +53,9 @@ class CalculadoraPINNApp(ctk.CTk):
 
     def _carregar_assets(self):
         """Carrega ícones e equações"""
+        # Compila o precificador Numba em segundo plano para não travar a GUI
+        threading.Thread(target=black_scholes_numba.aquecer, daemon=True).start()
+        
         try:
             # Garante que os diretórios existem
             icones.criar_todos_icones()
@@ -228,6 +235,7 @@ class CalculadoraPINNApp(ctk.CTk):
         # Área do Gráfico de Loss
         self.frame_grafico_loss = ctk.CTkFrame(frame)
         self.frame_grafico_loss.grid(row=1, column=0, sticky="nsew", padx=10, pady=5)
+        self.fig_loss, self.canvas_loss = self._criar_canvas(self.frame_grafico_loss)
 
     def _setup_aba_visualizacoes(self):
         frame = self.frames["visualizacoes"]
@@ -238,7 +246,7 @@ class CalculadoraPINNApp(ctk.CTk):
         painel_vis = ctk.CTkFrame(frame)
         painel_vis.grid(row=0, column=0, sticky="ew", padx=10, pady=10)
         
-        opcoes = ["Comparação 2D", "Erro Absoluto", "Superfície 3D", "Gregas"]
+        opcoes = ["Comparação 2D", "Erro Absoluto", "Superfície 3D", "Erro Superfície 3D", "Gregas"]
         self.combo_vis = ctk.CTkComboBox(painel_vis, values=opcoes, 
                                        command=self._atualizar_visualizacao)
         self.combo_vis.pack(side="left", padx=20, pady=10)
@@ -250,6 +258,7 @@ class CalculadoraPINNApp(ctk.CTk):
         # Área do Gráfico
         self.frame_grafico_vis = ctk.CTkFrame(frame)
         self.frame_grafico_vis.grid(row=1, column=0, sticky="nsew", padx=10, pady=5)
+        self.fig_vis, self.canvas_vis = self._criar_canvas(self.frame_grafico_vis)
 
     # --- Lógica de Negócio ---
 
@@ -276,6 +285,11 @@ class CalculadoraPINNApp(ctk.CTk):
                 'volatilidade': float(self.entradas_calc["Volatilidade (σ)"].get())
             }
             
+            # Entradas inalteradas: os resultados exibidos já estão corretos
+            chave = tuple(params.values())
+            if chave == self.ultimos_parametros_calc:
+                return
+            
             self.modelo_bs.configurar_parametros(**params)
             resumo = self.modelo_bs.obter_resumo()
             
@@ -285,6 +299,8 @@ class CalculadoraPINNApp(ctk.CTk):
             for grega, valor in resumo['gregas_call'].items():
                 nome_formatado = grega.capitalize()
                 self.lbls_gregas[nome_formatado].configure(text=f"{nome_formatado}: {valor:.6f}")
+            
+            self.ultimos_parametros_calc = chave
                 
         except ValueError as e:
             messagebox.showerror("Erro de Entrada", str(e))
@@ -317,13 +333,28 @@ class CalculadoraPINNApp(ctk.CTk):
 
     def _executar_treino(self, params):
         def callback(progresso, msg):
+            # Cópia do histórico tirada aqui, enquanto a thread de treino está parada
+            historico = list(self.pinn.historico_loss)
             self.after(0, lambda: self.progress_bar.set(progresso))
             self.after(0, lambda: self.lbl_status_treino.configure(text=msg))
+            self.after(0, lambda: self._atualizar_loss_ao_vivo(historico))
 
         historico = self.pinn.treinar(epocas=1000, callback_progresso=callback, **params)
         
         self.after(0, lambda: self._finalizar_treino(historico))
 
+    def _atualizar_loss_ao_vivo(self, historico):
+        widget_canvas = self.canvas_loss.get_tk_widget()
+        if not widget_canvas.winfo_manager():
+            # Sem draw_idle: o desenho completo fica com o visualizador
+            for widget in self.frame_grafico_loss.winfo_children():
+                if widget is not widget_canvas:
+                    widget.destroy()
+            widget_canvas.pack(fill="both", expand=True)
+        
+        # Só a linha é redesenhada a cada bloco de épocas
+        self.visualizador.atualizar_grafico_loss(historico, fig=self.fig_loss)
+
     def _finalizar_treino(self, historico):
         self.treinamento_em_andamento = False
         self.pinn_treinada = True
@@ -331,8 +362,8 @@ class CalculadoraPINNApp(ctk.CTk):
         self.lbl_status_treino.configure(text="Treinamento Concluído!")
         
         # Plota histórico
-        fig = self.visualizador.plotar_historico_treinamento(historico)
-        self._exibir_grafico(fig, self.frame_grafico_loss)
+        self.visualizador.plotar_historico_treinamento(historico, fig=self.fig_loss)
+        self._exibir_grafico(self.canvas_loss, self.frame_grafico_loss)
         
         messagebox.showinfo("Sucesso", "Rede Neural treinada com sucesso!")
 
@@ -341,11 +372,40 @@ class CalculadoraPINNApp(ctk.CTk):
             ctk.CTkLabel(self.frame_grafico_vis, 
                         text="Treine a rede neural primeiro para ver as visualizações.").pack(pady=20)
             return
-            
-        # Limpa frame anterior
-        for widget in self.frame_grafico_vis.winfo_children():
-            widget.destroy()
-            
+        
+        if self.visualizacao_em_andamento:
+            return
+        
+        # Os cálculos rodam fora da thread da interface
+        self.visualizacao_em_andamento = True
+        thread = threading.Thread(target=self._executar_visualizacao, args=(tipo_vis,),
+                                  daemon=True)
+        thread.start()
+
+    def _executar_visualizacao(self, tipo_vis):
+        plotagem = None
+        try:
+            plotagem = self._calcular_dados_visualizacao(tipo_vis)
+        except Exception as e:
+            print(f"Erro ao gerar visualização: {e}")
+        
+        self.after(0, lambda: self._finalizar_visualizacao(plotagem))
+
+    def _finalizar_visualizacao(self, plotagem):
+        self.visualizacao_em_andamento = False
+        if plotagem:
+            # A figura é compartilhada com o canvas, então é desenhada na thread da GUI
+            funcao_plot, args = plotagem
+            funcao_plot(*args, fig=self.fig_vis)
+            self._exibir_grafico(self.canvas_vis, self.frame_grafico_vis)
+
+    def _calcular_dados_visualizacao(self, tipo_vis):
+        """
+        Calcula os dados do gráfico (executado em thread de trabalho)
+        
+        Returns:
+            Tupla (método de plotagem do Visualizador, argumentos) ou None
+        """
         # Gera dados para plotagem
         S_range = np.linspace(50, 150, 100)
         t_fixo = 0.0 # Preço hoje
@@ -353,48 +413,62 @@ class CalculadoraPINNApp(ctk.CTk):
         # Previsões PINN
         precos_pinn = self.pinn.prever(S_range, t_fixo)
         
-        # Preços Analíticos
-        precos_analiticos = []
-        for s in S_range:
-            precos_analiticos.append(self.modelo_bs.calcular_superficie_precos([s], [self.pinn.T])[0][0])
+        # Preços Analíticos (lote único, com os mesmos parâmetros da PINN)
+        precos_analiticos = precificar_lote(S_range, self.pinn.K, self.pinn.T,
+                                            self.pinn.r, self.pinn.sigma)
             
-        fig = None
+        plotagem = None
         if tipo_vis == "Comparação 2D":
-            fig = self.visualizador.plotar_comparacao_2d(S_range, precos_analiticos, precos_pinn, self.pinn.K)
+            plotagem = (self.visualizador.plotar_comparacao_2d,
+                        (S_range, precos_analiticos, precos_pinn, self.pinn.K))
         elif tipo_vis == "Erro Absoluto":
-            erro = np.abs(np.array(precos_analiticos) - np.array(precos_pinn))
-            fig = self.visualizador.plotar_erro_absoluto(S_range, erro)
-        elif tipo_vis == "Superfície 3D":
+            plotagem = (self.visualizador.calcular_e_plotar_erro,
+                        (S_range, precos_analiticos, precos_pinn))
+        elif tipo_vis in ("Superfície 3D", "Erro Superfície 3D"):
             S_mesh = np.linspace(50, 150, 30)
             T_mesh = np.linspace(0, self.pinn.T, 30)
-            S_grid, T_grid = np.meshgrid(S_mesh, T_mesh)
+            S_grid, T_grid = self.visualizador.montar_grade(S_mesh, T_mesh)
+            formato = (T_mesh.size, S_mesh.size)
             
-            # Previsão em lote
-            S_flat = S_grid.flatten()
-            T_flat = T_grid.flatten()
-            V_pred = self.pinn.prever(S_flat, T_flat).reshape(S_grid.shape)
+            # Previsão em lote (a rede recebe os pares achatados)
+            S_flat = np.broadcast_to(S_grid, formato).ravel()
+            T_flat = np.broadcast_to(T_grid, formato).ravel()
+            V_pred = self.pinn.prever(S_flat, T_flat).reshape(formato)
             
-            fig = self.visualizador.plotar_superficie_3d(S_grid, T_grid, V_pred)
+            if tipo_vis == "Superfície 3D":
+                plotagem = (self.visualizador.plotar_superficie_3d, (S_grid, T_grid, V_pred))
+            else:
+                # Superfície analítica direto dos vetores (tempo até o vencimento = T - t)
+                V_analitico = precificar_superficie(S_mesh, self.pinn.T - T_mesh, self.pinn.K,
+                                                    self.pinn.r, self.pinn.sigma)
+                erro = np.abs(V_analitico - V_pred)
+                plotagem = (self.visualizador.plotar_superficie_3d,
+                            (S_grid, T_grid, erro, 'Erro Absoluto |Analítico - PINN|'))
         elif tipo_vis == "Gregas":
-            # Calcula gregas analíticas para comparação
-            gregas = {'delta': [], 'gamma': [], 'vega': [], 'theta': []}
-            for s in S_range:
-                self.modelo_bs.preco_ativo = s
-                g = self.modelo_bs.calcular_todas_gregas()
-                for k in gregas: gregas[k].append(g[k])
-            fig = self.visualizador.plotar_gregas(S_range, gregas)
+            # Calcula gregas analíticas para comparação (um único broadcast)
+            gregas = gregas_vetorizadas(S_range, self.pinn.K, self.pinn.T,
+                                        self.pinn.r, self.pinn.sigma)
+            plotagem = (self.visualizador.plotar_gregas, (S_range, gregas))
             
-        if fig:
-            self._exibir_grafico(fig, self.frame_grafico_vis)
+        return plotagem
 
-    def _exibir_grafico(self, fig, frame_container):
-        # Limpa container
-        for widget in frame_container.winfo_children():
-            widget.destroy()
-            
+    def _criar_canvas(self, frame_container):
+        """Cria a figura e o canvas persistentes de uma área de gráfico"""
+        fig = Figure(figsize=(8, 6), dpi=100)
         canvas = FigureCanvasTkAgg(fig, master=frame_container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        return fig, canvas
+
+    def _exibir_grafico(self, canvas, frame_container):
+        widget_canvas = canvas.get_tk_widget()
+        
+        # Remove mensagens anteriores, mantendo o canvas reutilizável
+        for widget in frame_container.winfo_children():
+            if widget is not widget_canvas:
+                widget.destroy()
+        
+        if not widget_canvas.winfo_manager():
+            widget_canvas.pack(fill="both", expand=True)
+        canvas.draw_idle()
 
     # --- Navegação ---
     def _ocultar_todos_frames(self):
@@ -1,15 +1,43 @@
 """
 Sistema de renderização de equações LaTeX para a Calculadora PINN + Black-Scholes
 """
+import hashlib
+import json
+import math
 import os
-import matplotlib.pyplot as plt
 from matplotlib import rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.mathtext import MathTextParser
+from matplotlib.transforms import Bbox
 import numpy as np
+from PIL import Image, ImageDraw
 
 # Configuração para renderização LaTeX de alta qualidade
 rcParams['mathtext.fontset'] = 'stix'
 rcParams['font.family'] = 'STIXGeneral'
 
+# Incrementar sempre que cores, fontes ou layout das imagens mudarem,
+# para invalidar o cache de PNGs já renderizados
+VERSAO_ESTILO = 5
+
+# Tamanhos padrão (polegadas) e resolução das duas variantes de cada equação
+TAMANHO_SIMPLES = (10, 2)
+TAMANHO_COMPLETO = (12, 3)
+DPI_EQUACOES = 150
+
+# Cor de fundo das variantes desenhadas em figura
+CORES_FUNDO = {'completo': '#1e1e2e'}
+
+# Rasterizador de mathtext usado sem figura (mesmos bitmaps do backend Agg)
+_PARSER_MATHTEXT = MathTextParser('agg')
+
+
+def _arredondar(valor):
+    """Arredonda para o inteiro mais próximo, com .5 para cima"""
+    return math.floor(valor + 0.5)
+
 
 class GeradorEquacoes:
     """Classe para gerar e renderizar equações matemáticas"""
@@ -18,6 +46,13 @@ class GeradorEquacoes:
         self.diretorio = os.path.join(os.path.dirname(__file__), 'equacoes')
         os.makedirs(self.diretorio, exist_ok=True)
         
+        # Manifesto com o hash do conteúdo de cada PNG já renderizado
+        self._caminho_manifesto = os.path.join(self.diretorio, 'manifesto.json')
+        self._manifesto = self._carregar_manifesto()
+        
+        # Figuras Agg reutilizadas entre renderizações, indexadas por (tamanho, dpi, faixas)
+        self._figuras = {}
+        
         # Dicionário com todas as equações
         self.equacoes = {
             'black_scholes_pde': {
@@ -97,49 +132,212 @@ class GeradorEquacoes:
             },
         }
     
-    def renderizar_equacao(self, nome_equacao, tamanho_figura=(10, 2), dpi=150):
+    def _carregar_manifesto(self):
+        """Lê o manifesto de cache (vazio se inexistente ou corrompido)"""
+        try:
+            with open(self._caminho_manifesto, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _salvar_manifesto(self):
+        with open(self._caminho_manifesto, 'w', encoding='utf-8') as f:
+            json.dump(self._manifesto, f, indent=2, sort_keys=True)
+    
+    def _chave_cache(self, *partes):
+        """Hash SHA256 do conteúdo e estilo que determinam uma imagem"""
+        conteudo = '\x00'.join(str(p) for p in (VERSAO_ESTILO,) + partes)
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+    
+    def _em_cache(self, caminho, chave):
+        """Verifica se o PNG existe e foi gerado a partir do mesmo conteúdo"""
+        nome_arquivo = os.path.basename(caminho)
+        return self._manifesto.get(nome_arquivo) == chave and os.path.exists(caminho)
+    
+    def _registrar_cache(self, caminho, chave):
+        self._manifesto[os.path.basename(caminho)] = chave
+        self._salvar_manifesto()
+    
+    def _obter_figura(self, tamanho_figura, dpi, faixas=1):
+        """
+        Retorna figura, canvas e eixos reutilizáveis, já limpos
+        
+        Com faixas > 1 a figura empilha várias áreas de `tamanho_figura`, uma
+        por eixo, cada uma com a mesma posição relativa da figura simples.
+        Assim cada faixa rasteriza exatamente como uma figura isolada.
+        """
+        chave = (tuple(tamanho_figura), dpi, faixas)
+        if chave not in self._figuras:
+            largura, altura = tamanho_figura
+            fig = Figure(figsize=(largura, altura * faixas), dpi=dpi)
+            canvas = FigureCanvasAgg(fig)
+            
+            if faixas == 1:
+                ax = fig.add_subplot(111)
+                ax.axis('off')
+                # Layout calculado uma única vez; ax.cla() preserva a posição do eixo
+                fig.tight_layout()
+                eixos = [ax]
+            else:
+                # Reaproveita a posição do eixo da figura de uma faixa
+                posicao = self._obter_figura(tamanho_figura, dpi)[2][0].get_position()
+                eixos = []
+                for i in range(faixas):
+                    base = (faixas - 1 - i) / faixas
+                    eixos.append(fig.add_axes([posicao.x0, base + posicao.y0 / faixas,
+                                               posicao.width, posicao.height / faixas]))
+            
+            self._figuras[chave] = (fig, canvas, eixos)
+        
+        fig, canvas, eixos = self._figuras[chave]
+        for ax in eixos:
+            ax.cla()
+            ax.axis('off')
+        return fig, canvas, eixos
+    
+    def _desenhar_lote(self, variante, nomes, caminhos, tamanho_figura, dpi):
+        """
+        Desenha várias equações da mesma variante em uma única figura
+        
+        A figura é rasterizada uma vez e cada faixa é recortada como
+        bbox_inches='tight' (margem de 0.1 pol.) e salva via Pillow.
+        """
+        if variante == 'simples':
+            # A versão simples não usa figura (ver _desenhar_simples)
+            for nome, caminho in zip(nomes, caminhos):
+                self._desenhar_simples(nome, caminho, tamanho_figura, dpi)
+            return
+        
+        fig, canvas, eixos = self._obter_figura(tamanho_figura, dpi, len(nomes))
+        
+        adicionar_textos = getattr(self, f'_textos_{variante}')
+        for ax, nome in zip(eixos, nomes):
+            adicionar_textos(ax, self.equacoes[nome])
+        
+        fig.patch.set_facecolor(CORES_FUNDO[variante])
+        canvas.draw()
+        
+        imagem = Image.fromarray(np.asarray(canvas.buffer_rgba()))
+        largura = imagem.width
+        altura_faixa = round(tamanho_figura[1] * dpi)
+        renderer = canvas.get_renderer()
+        
+        for i, (ax, caminho) in enumerate(zip(eixos, caminhos)):
+            # Caixa do conteúdo em polegadas relativas à própria faixa, para
+            # arredondar exatamente como uma figura isolada (bbox_inches='tight')
+            base_faixa = (len(eixos) - 1 - i) * tamanho_figura[1]
+            caixa = ax.get_tightbbox(renderer).transformed(fig.dpi_scale_trans.inverted())
+            caixa = caixa.translated(0, -base_faixa).padded(0.1)
+            
+            # Pixels arredondados a 6 casas e depois com meio para cima: o ruído
+            # de ponto flutuante não muda o recorte conforme a posição da faixa
+            x0, y0, x1, y1 = (round(v * dpi, 6) for v in caixa.extents)
+            topo = i * altura_faixa
+            recorte = (max(_arredondar(x0), 0),
+                       topo + max(_arredondar(altura_faixa - y1), 0),
+                       min(_arredondar(x1), largura),
+                       topo + min(_arredondar(altura_faixa - y0), altura_faixa))
+            
+            imagem.crop(recorte).save(caminho, 'PNG', compress_level=1, optimize=False)
+    
+    def _alvo_simples(self, nome_equacao, tamanho_figura, dpi):
+        """Caminho e chave de cache da versão simples"""
+        eq = self.equacoes[nome_equacao]
+        caminho = os.path.join(self.diretorio, f'{nome_equacao}.png')
+        chave = self._chave_cache('simples', eq['latex'], tamanho_figura, dpi)
+        return caminho, chave
+    
+    def _alvo_completo(self, nome_equacao, tamanho_figura, dpi):
+        """Caminho e chave de cache da versão completa"""
+        eq = self.equacoes[nome_equacao]
+        caminho = os.path.join(self.diretorio, f'{nome_equacao}_completo.png')
+        chave = self._chave_cache('completo', eq['latex'], eq['titulo'], eq['descricao'],
+                                  tamanho_figura, dpi)
+        return caminho, chave
+    
+    def renderizar_equacao(self, nome_equacao, tamanho_figura=TAMANHO_SIMPLES, dpi=DPI_EQUACOES):
         """Renderiza uma equação LaTeX e salva como imagem"""
         if nome_equacao not in self.equacoes:
             raise ValueError(f"Equação '{nome_equacao}' não encontrada")
         
+        caminho, chave = self._alvo_simples(nome_equacao, tamanho_figura, dpi)
+        if not self._em_cache(caminho, chave):
+            self._desenhar_simples(nome_equacao, caminho, tamanho_figura, dpi)
+            self._registrar_cache(caminho, chave)
+        
+        return caminho
+    
+    def _desenhar_simples(self, nome_equacao, caminho, tamanho_figura, dpi):
+        """
+        Desenha a versão simples da equação e salva em `caminho` (fundo transparente)
+        
+        Sem figura: o mathtext é rasterizado direto para uma máscara, usada
+        como alfa do texto branco sobre a caixa arredondada desenhada pelo
+        Pillow (mesma geometria do boxstyle 'round,pad=0.8' com borda de 2 pt
+        e alpha 0.9). A tela tem o tamanho da versão em figura salva com
+        bbox_inches='tight': a área do eixo após tight_layout mais a margem,
+        ampliada só se a caixa não couber nela.
+        """
         eq = self.equacoes[nome_equacao]
+        pixels_por_ponto = dpi / 72
+        tamanho_fonte = 24
         
-        fig, ax = plt.subplots(figsize=tamanho_figura, dpi=dpi)
-        ax.axis('off')
+        texto = _PARSER_MATHTEXT.parse(eq['latex'], dpi=dpi,
+                                       prop=FontProperties(size=tamanho_fonte))
+        mascara = Image.fromarray(np.asarray(texto.image), 'L')
         
-        # Renderiza a equação
-        ax.text(0.5, 0.5, eq['latex'], 
-                fontsize=24, 
-                ha='center', 
-                va='center',
-                color='white',
-                bbox=dict(boxstyle='round,pad=0.8', 
-                         facecolor='#1f538d', 
-                         edgecolor='#64b5f6',
-                         linewidth=2,
-                         alpha=0.9))
+        # Caixa: pad e raio de 0.8 * fonte, borda de 2 pt, margem de 0.1 pol. (como bbox tight)
+        pad = 0.8 * tamanho_fonte * pixels_por_ponto
+        espessura = 2 * pixels_por_ponto
+        meia_largura = texto.width / 2 + pad
+        meia_altura = texto.height / 2 + pad
+        margem = espessura / 2 + 0.1 * dpi
         
-        # Salva a imagem
-        caminho = os.path.join(self.diretorio, f'{nome_equacao}.png')
-        plt.tight_layout()
-        plt.savefig(caminho, bbox_inches='tight', 
-                   facecolor='none', 
-                   edgecolor='none',
-                   transparent=True)
-        plt.close()
+        # Eixo da figura após tight_layout (pad de 1.08 * fonte padrão) e
+        # margem de 0.1 pol. do bbox tight
+        recuo = 2 * 1.08 * rcParams['font.size'] / 72 - 0.2
+        largura = max(_arredondar((tamanho_figura[0] - recuo) * dpi),
+                      math.ceil(2 * (meia_largura + margem)))
+        altura = max(_arredondar((tamanho_figura[1] - recuo) * dpi),
+                     math.ceil(2 * (meia_altura + margem)))
         
-        return caminho
+        # O contorno da caixa passa no meio da borda, que o Pillow desenha por dentro
+        imagem = Image.new('RGBA', (largura, altura), (0, 0, 0, 0))
+        externo_x = meia_largura + espessura / 2
+        externo_y = meia_altura + espessura / 2
+        ImageDraw.Draw(imagem).rounded_rectangle(
+            (round(largura / 2 - externo_x), round(altura / 2 - externo_y),
+             round(largura / 2 + externo_x) - 1, round(altura / 2 + externo_y) - 1),
+            radius=round(pad + espessura / 2),
+            fill=(0x1f, 0x53, 0x8d, 230),
+            outline=(0x64, 0xb5, 0xf6, 230),
+            width=max(round(espessura), 1))
+        
+        # Texto branco centrado na caixa, com a máscara do mathtext como alfa
+        camada_texto = Image.new('RGBA', (largura, altura), (255, 255, 255, 0))
+        alfa_texto = Image.new('L', (largura, altura), 0)
+        alfa_texto.paste(mascara, ((largura - mascara.width) // 2,
+                                   (altura - mascara.height) // 2))
+        camada_texto.putalpha(alfa_texto)
+        imagem = Image.alpha_composite(imagem, camada_texto)
+        
+        imagem.save(caminho, 'PNG', compress_level=1, optimize=False)
     
-    def renderizar_equacao_com_titulo(self, nome_equacao, tamanho_figura=(12, 3), dpi=150):
+    def renderizar_equacao_com_titulo(self, nome_equacao, tamanho_figura=TAMANHO_COMPLETO,
+                                      dpi=DPI_EQUACOES):
         """Renderiza uma equação com título e descrição"""
         if nome_equacao not in self.equacoes:
             raise ValueError(f"Equação '{nome_equacao}' não encontrada")
         
-        eq = self.equacoes[nome_equacao]
-        
-        fig, ax = plt.subplots(figsize=tamanho_figura, dpi=dpi)
-        ax.axis('off')
+        caminho, chave = self._alvo_completo(nome_equacao, tamanho_figura, dpi)
+        if not self._em_cache(caminho, chave):
+            self._desenhar_completo(nome_equacao, caminho, tamanho_figura, dpi)
+            self._registrar_cache(caminho, chave)
         
+        return caminho
+    
+    def _textos_completo(self, ax, eq):
+        """Adiciona ao eixo título, equação e descrição da versão completa"""
         # Título
         ax.text(0.5, 0.85, eq['titulo'],
                 fontsize=18,
@@ -148,7 +346,8 @@ class GeradorEquacoes:
                 color='#64b5f6',
                 weight='bold')
         
-        # Equação
+        # Equação (o parse do mathtext já é memorizado pelo renderizador do
+        # Matplotlib; a versão simples usa 24 pt, então não há parse a reaproveitar)
         ax.text(0.5, 0.5, eq['latex'],
                 fontsize=22,
                 ha='center',
@@ -167,40 +366,78 @@ class GeradorEquacoes:
                 va='bottom',
                 color='#b0bec5',
                 style='italic')
-        
-        # Salva a imagem
-        caminho = os.path.join(self.diretorio, f'{nome_equacao}_completo.png')
-        plt.tight_layout()
-        plt.savefig(caminho, bbox_inches='tight',
-                   facecolor='#1e1e2e',
-                   edgecolor='none')
-        plt.close()
-        
-        return caminho
+    
+    def _desenhar_completo(self, nome_equacao, caminho, tamanho_figura, dpi):
+        """Desenha a versão com título e descrição e salva em `caminho`"""
+        self._desenhar_lote('completo', [nome_equacao], [caminho], tamanho_figura, dpi)
     
     def renderizar_todas_equacoes(self):
         """Renderiza todas as equações disponíveis"""
         print("📐 Gerando equações LaTeX...")
         caminhos = {}
+        pendentes = []
         
         for nome in self.equacoes.keys():
-            # Versão simples
-            caminho_simples = self.renderizar_equacao(nome)
-            # Versão completa com título
-            caminho_completo = self.renderizar_equacao_com_titulo(nome)
+            # Versão simples e versão completa com título
+            caminho_simples, chave_simples = self._alvo_simples(
+                nome, TAMANHO_SIMPLES, DPI_EQUACOES)
+            caminho_completo, chave_completo = self._alvo_completo(
+                nome, TAMANHO_COMPLETO, DPI_EQUACOES)
+            
+            if not self._em_cache(caminho_simples, chave_simples):
+                pendentes.append(('simples', nome, caminho_simples, chave_simples,
+                                  TAMANHO_SIMPLES))
+            if not self._em_cache(caminho_completo, chave_completo):
+                pendentes.append(('completo', nome, caminho_completo, chave_completo,
+                                  TAMANHO_COMPLETO))
             
             caminhos[nome] = {
                 'simples': caminho_simples,
                 'completo': caminho_completo
             }
-            print(f"  ✓ {self.equacoes[nome]['titulo']}")
+        
+        if pendentes:
+            # Uma figura grande por variante com todas as equações pendentes,
+            # recortada em faixas; com no máximo dois lotes (e a versão simples
+            # sem figura), renderizar no próprio processo é mais rápido que
+            # iniciar processos de trabalho
+            lotes = {}
+            for variante, nome, caminho, chave, tamanho in pendentes:
+                lotes.setdefault((variante, tamanho), []).append((nome, caminho, chave))
+            
+            for (variante, tamanho), itens in lotes.items():
+                self._desenhar_lote(variante,
+                                    [nome for nome, _, _ in itens],
+                                    [caminho for _, caminho, _ in itens],
+                                    tamanho, DPI_EQUACOES)
+                for nome, caminho, chave in itens:
+                    self._manifesto[os.path.basename(caminho)] = chave
+                    print(f"  ✓ {os.path.basename(caminho)} ({self.equacoes[nome]['titulo']})")
+            
+            self._salvar_manifesto()
         
         print(f"\n✅ Todas as equações foram salvas em: {self.diretorio}")
         return caminhos
     
     def criar_painel_explicativo(self):
         """Cria um painel com múltiplas equações organizadas"""
-        fig = plt.figure(figsize=(14, 10), dpi=120)
+        equacoes_ordem = [
+            'black_scholes_pde', 'funcao_perda_pinn',
+            'call_option', 'put_option',
+            'd1', 'd2',
+            'delta', 'gamma',
+            'vega', 'theta'
+        ]
+        
+        caminho = os.path.join(self.diretorio, 'painel_completo.png')
+        chave = self._chave_cache('painel', *(
+            (self.equacoes[nome]['latex'], self.equacoes[nome]['titulo'],
+             self.equacoes[nome]['descricao']) for nome in equacoes_ordem))
+        if self._em_cache(caminho, chave):
+            return caminho
+        
+        fig = Figure(figsize=(14, 10), dpi=120)
+        canvas = FigureCanvasAgg(fig)
         fig.patch.set_facecolor('#1e1e2e')
         
         # Título principal
@@ -210,60 +447,59 @@ class GeradorEquacoes:
                     weight='bold',
                     y=0.98)
         
-        # Grid de subplots
+        # Grade 5x2 usada apenas para posicionar os textos (sem criar eixos)
         gs = fig.add_gridspec(5, 2, hspace=0.4, wspace=0.3,
                              left=0.05, right=0.95, top=0.92, bottom=0.05)
         
-        equacoes_ordem = [
-            'black_scholes_pde', 'funcao_perda_pinn',
-            'call_option', 'put_option',
-            'd1', 'd2',
-            'delta', 'gamma',
-            'vega', 'theta'
-        ]
-        
         for idx, nome_eq in enumerate(equacoes_ordem):
             row = idx // 2
             col = idx % 2
             
-            ax = fig.add_subplot(gs[row, col])
-            ax.axis('off')
+            celula = gs[row, col].get_position(fig)
+            x_centro = celula.x0 + 0.5 * celula.width
+            
+            def y_celula(fracao):
+                return celula.y0 + fracao * celula.height
             
             eq = self.equacoes[nome_eq]
             
             # Título da equação
-            ax.text(0.5, 0.75, eq['titulo'],
-                   fontsize=12,
-                   ha='center',
-                   va='top',
-                   color='#64b5f6',
-                   weight='bold',
-                   transform=ax.transAxes)
+            fig.text(x_centro, y_celula(0.75), eq['titulo'],
+                    fontsize=12,
+                    ha='center',
+                    va='top',
+                    color='#64b5f6',
+                    weight='bold')
             
             # Equação
-            ax.text(0.5, 0.4, eq['latex'],
-                   fontsize=14,
-                   ha='center',
-                   va='center',
-                   color='white',
-                   transform=ax.transAxes)
+            fig.text(x_centro, y_celula(0.4), eq['latex'],
+                    fontsize=14,
+                    ha='center',
+                    va='center',
+                    color='white')
             
             # Descrição
-            ax.text(0.5, 0.05, eq['descricao'],
-                   fontsize=9,
-                   ha='center',
-                   va='bottom',
-                   color='#90a4ae',
-                   style='italic',
-                   transform=ax.transAxes)
+            fig.text(x_centro, y_celula(0.05), eq['descricao'],
+                    fontsize=9,
+                    ha='center',
+                    va='bottom',
+                    color='#90a4ae',
+                    style='italic')
+        
+        # Enquadramento: região da grade (como os antigos eixos vazios) + textos
+        largura, altura = fig.get_size_inches()
+        regiao_grade = Bbox.from_extents(0.05 * largura, 0.05 * altura,
+                                         0.95 * largura, 0.92 * altura)
+        textos = fig.get_tightbbox(canvas.get_renderer())
+        enquadramento = Bbox.union([regiao_grade, textos]).padded(0.1)
         
         # Salva o painel
-        caminho = os.path.join(self.diretorio, 'painel_completo.png')
-        plt.savefig(caminho, bbox_inches='tight',
+        fig.savefig(caminho, bbox_inches=enquadramento,
                    facecolor='#1e1e2e',
-                   edgecolor='none')
-        plt.close()
+                   edgecolor='none',
+                   pil_kwargs={'compress_level': 1, 'optimize': False})
         
+        self._registrar_cache(caminho, chave)
         print(f"  ✓ Painel explicativo completo criado")
         return caminho
     
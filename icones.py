@@ -1,28 +1,22 @@
 """
 Gerador de ícones e assets visuais para a Calculadora PINN + Black-Scholes
 """
+import itertools
 import os
-from PIL import Image, ImageDraw, ImageFont
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PIL import Image, ImageDraw, ImageFont, ImageOps
 import numpy as np
 
 
 def criar_gradiente(largura, altura, cor1, cor2, direcao='vertical'):
     """Cria um gradiente entre duas cores"""
-    imagem = Image.new('RGB', (largura, altura))
-    desenho = ImageDraw.Draw(imagem)
-    
-    for i in range(altura if direcao == 'vertical' else largura):
-        proporcao = i / (altura if direcao == 'vertical' else largura)
-        r = int(cor1[0] * (1 - proporcao) + cor2[0] * proporcao)
-        g = int(cor1[1] * (1 - proporcao) + cor2[1] * proporcao)
-        b = int(cor1[2] * (1 - proporcao) + cor2[2] * proporcao)
-        
-        if direcao == 'vertical':
-            desenho.line([(0, i), (largura, i)], fill=(r, g, b))
-        else:
-            desenho.line([(i, 0), (i, altura)], fill=(r, g, b))
+    # Rampa 0-255 gerada em C pelo Pillow (preto no topo, branco na base)
+    rampa = Image.linear_gradient('L')
+    if direcao != 'vertical':
+        rampa = rampa.transpose(Image.Transpose.ROTATE_90)
     
-    return imagem
+    rampa = rampa.resize((largura, altura), Image.Resampling.BILINEAR)
+    return ImageOps.colorize(rampa, black=tuple(cor1[:3]), white=tuple(cor2[:3]))
 
 
 def criar_icone_app():
@@ -49,36 +43,23 @@ def criar_icone_app():
     raio_neuronio = 8
     espacamento = 50
     
-    # Camada entrada (3 neurônios)
-    for i in range(3):
-        y = centro_y - espacamento + i * espacamento
-        desenho.ellipse([40-raio_neuronio, y-raio_neuronio, 
-                        40+raio_neuronio, y+raio_neuronio],
-                       fill=(100, 200, 255), outline=(255, 255, 255))
-    
-    # Camada oculta (4 neurônios)
-    for i in range(4):
-        y = centro_y - 1.5*espacamento + i * espacamento
-        desenho.ellipse([centro_x-raio_neuronio, y-raio_neuronio,
-                        centro_x+raio_neuronio, y+raio_neuronio],
-                       fill=(150, 100, 255), outline=(255, 255, 255))
-        
-        # Conexões
-        for j in range(3):
-            y_entrada = centro_y - espacamento + j * espacamento
-            desenho.line([(40, y_entrada), (centro_x, y)], 
-                        fill=(255, 255, 255, 100), width=1)
-    
-    # Camada saída (1 neurônio)
-    desenho.ellipse([tamanho-40-raio_neuronio, centro_y-raio_neuronio,
-                    tamanho-40+raio_neuronio, centro_y+raio_neuronio],
-                   fill=(255, 150, 100), outline=(255, 255, 255))
-    
-    # Conexões para saída
-    for i in range(4):
-        y = centro_y - 1.5*espacamento + i * espacamento
-        desenho.line([(centro_x, y), (tamanho-40, centro_y)],
-                    fill=(255, 255, 255, 100), width=1)
+    # Centros de cada camada: entrada (3), oculta (4) e saída (1)
+    entrada = np.column_stack([np.full(3, 40), centro_y + espacamento * np.arange(-1, 2)])
+    oculta = np.column_stack([np.full(4, centro_x), centro_y + espacamento * (np.arange(4) - 1.5)])
+    saida = np.array([[tamanho - 40, centro_y]])
+    
+    # Conexões entre camadas (desenhadas antes, ficam sob os neurônios)
+    conexoes = itertools.chain(itertools.product(entrada.tolist(), oculta.tolist()),
+                               itertools.product(oculta.tolist(), saida.tolist()))
+    for inicio, fim in conexoes:
+        desenho.line([tuple(inicio), tuple(fim)], fill=(255, 255, 255, 100), width=1)
+    
+    # Neurônios
+    camadas = [(entrada, (100, 200, 255)), (oculta, (150, 100, 255)), (saida, (255, 150, 100))]
+    for centros, cor in camadas:
+        caixas = np.hstack([centros - raio_neuronio, centros + raio_neuronio]).tolist()
+        for caixa in caixas:
+            desenho.ellipse(caixa, fill=cor, outline=(255, 255, 255))
     
     return imagem
 
@@ -155,11 +136,10 @@ def criar_icone_grafico():
                     fill=(46, 125, 50), outline=(100, 255, 150), width=2)
     
     # Desenha curva (simulando gráfico)
-    pontos = []
-    for i in range(15):
-        x = 12 + i * 3
-        y = tamanho//2 + int(15 * np.sin(i * 0.5))
-        pontos.append((x, y))
+    i = np.arange(15)
+    x = 12 + i * 3
+    y = tamanho//2 + (15 * np.sin(i * 0.5)).astype(int)
+    pontos = list(zip(x.tolist(), y.tolist()))
     
     desenho.line(pontos, fill=(100, 255, 150), width=3, joint='curve')
     
@@ -172,8 +152,53 @@ def criar_icone_grafico():
     return imagem
 
 
+def reduzir_icone(imagem, tamanho):
+    """
+    Reduz um ícone quadrado para `tamanho` pixels
+    
+    Fatores inteiros usam Image.reduce (média de blocos, bem mais rápida);
+    os demais caem no LANCZOS.
+    """
+    fator, resto = divmod(imagem.width, tamanho)
+    if resto == 0 and imagem.height == imagem.width:
+        return imagem.reduce(fator)
+    return imagem.resize((tamanho, tamanho), Image.Resampling.LANCZOS)
+
+
+def salvar_png(imagem, caminho, compress_level=1):
+    """Salva um PNG com compressão rápida (ícones pequenos, sem otimização)"""
+    imagem.save(caminho, 'PNG', compress_level=compress_level, optimize=False)
+
+
+def precisa_reconstruir(caminho):
+    """Indica se o arquivo não existe ou é mais antigo que este gerador"""
+    return (not os.path.exists(caminho)
+            or os.path.getmtime(caminho) < os.path.getmtime(__file__))
+
+
+def _salvar_icones_app(dir_icones):
+    """Gera o ícone principal e suas versões reduzidas"""
+    icone_app = criar_icone_app()
+    salvar_png(icone_app, os.path.join(dir_icones, 'app_icon.png'))
+    for tamanho in (128, 64, 32):
+        salvar_png(reduzir_icone(icone_app, tamanho),
+                   os.path.join(dir_icones, f'app_icon_{tamanho}.png'))
+
+
+def _salvar_fundo(dir_icones):
+    """Gera a imagem de fundo com gradiente"""
+    fundo = criar_gradiente(1400, 900, (20, 30, 48), (31, 83, 141))
+    # Gradiente grande e suave: o nível padrão (6) comprime melhor e até mais rápido
+    salvar_png(fundo, os.path.join(dir_icones, 'fundo_gradiente.png'), compress_level=6)
+
+
 def criar_todos_icones():
-    """Cria todos os ícones do projeto"""
+    """
+    Cria os ícones do projeto que estiverem ausentes ou desatualizados
+    
+    Arquivos mais novos que este módulo são mantidos; os demais são gerados
+    em paralelo (o Pillow libera o GIL nas rotinas de desenho e compressão).
+    """
     diretorio = os.path.dirname(os.path.abspath(__file__))
     dir_icones = os.path.join(diretorio, 'icones')
     
@@ -182,28 +207,32 @@ def criar_todos_icones():
     
     print("🎨 Gerando ícones...")
     
-    # Ícone principal
-    icone_app = criar_icone_app()
-    icone_app.save(os.path.join(dir_icones, 'app_icon.png'))
-    icone_app.resize((128, 128)).save(os.path.join(dir_icones, 'app_icon_128.png'))
-    icone_app.resize((64, 64)).save(os.path.join(dir_icones, 'app_icon_64.png'))
-    icone_app.resize((32, 32)).save(os.path.join(dir_icones, 'app_icon_32.png'))
-    print("  ✓ Ícone principal criado")
-    
-    # Ícones de botões
-    criar_icone_calcular().save(os.path.join(dir_icones, 'calcular.png'))
-    print("  ✓ Ícone calcular criado")
-    
-    criar_icone_treinar().save(os.path.join(dir_icones, 'treinar.png'))
-    print("  ✓ Ícone treinar criado")
-    
-    criar_icone_grafico().save(os.path.join(dir_icones, 'grafico.png'))
-    print("  ✓ Ícone gráfico criado")
+    # (descrição, arquivos gerados, função que gera e salva)
+    tarefas = [
+        ('Ícone principal',
+         ['app_icon.png', 'app_icon_128.png', 'app_icon_64.png', 'app_icon_32.png'],
+         lambda: _salvar_icones_app(dir_icones)),
+        ('Ícone calcular', ['calcular.png'],
+         lambda: salvar_png(criar_icone_calcular(), os.path.join(dir_icones, 'calcular.png'))),
+        ('Ícone treinar', ['treinar.png'],
+         lambda: salvar_png(criar_icone_treinar(), os.path.join(dir_icones, 'treinar.png'))),
+        ('Ícone gráfico', ['grafico.png'],
+         lambda: salvar_png(criar_icone_grafico(), os.path.join(dir_icones, 'grafico.png'))),
+        ('Fundo gradiente', ['fundo_gradiente.png'],
+         lambda: _salvar_fundo(dir_icones)),
+    ]
     
-    # Cria imagem de fundo com gradiente
-    fundo = criar_gradiente(1400, 900, (20, 30, 48), (31, 83, 141))
-    fundo.save(os.path.join(dir_icones, 'fundo_gradiente.png'))
-    print("  ✓ Fundo gradiente criado")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futuros = {}
+        for descricao, arquivos, gerar in tarefas:
+            if any(precisa_reconstruir(os.path.join(dir_icones, a)) for a in arquivos):
+                futuros[executor.submit(gerar)] = descricao
+            else:
+                print(f"  • {descricao} já atualizado")
+        
+        for futuro in as_completed(futuros):
+            futuro.result()
+            print(f"  ✓ {futuros[futuro]} criado")
     
     print(f"\n✅ Todos os ícones foram salvos em: {dir_icones}")
     return dir_icones
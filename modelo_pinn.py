@@ -2,14 +2,26 @@
 Implementação da Rede Neural Informada pela Física (PINN) para Black-Scholes
 Utiliza TensorFlow para criar uma rede neural profunda que aprende a resolver a EDP
 """
-import tensorflow as tf
 import numpy as np
 import time
 
+# TensorFlow é importado sob demanda (ver _importar_tensorflow): o import
+# custa alguns segundos e só é necessário quando uma PINN é criada
+tf = None
+
 # Configurações para melhor performance e reprodutibilidade
-tf.random.set_seed(42)
 np.random.seed(42)
 
+
+def _importar_tensorflow():
+    """Importa o TensorFlow na primeira chamada e fixa a semente"""
+    global tf
+    if tf is None:
+        import tensorflow
+        tensorflow.random.set_seed(42)
+        tf = tensorflow
+    return tf
+
 class RedeNeuralPINN:
     """
     Rede Neural Informada pela Física para resolver a equação de Black-Scholes
@@ -20,11 +32,56 @@ class RedeNeuralPINN:
     3. As condições de contorno em S=0 e S=S_max
     """
     
-    def __init__(self, camadas=[2, 50, 50, 50, 50, 1], learning_rate=0.001):
+    # Métodos compilados com tf.function na criação da instância
+    _METODOS_GRAFO = ('calcular_derivadas', 'calcular_perda_pde',
+                      'calcular_perda', 'passo_treinamento', 'treinar_k_passos',
+                      'reamostrar_colocacao')
+    
+    # Subconjunto compilado também com XLA (jit_compile) quando ativado
+    _METODOS_XLA = ('calcular_derivadas', 'calcular_perda_pde',
+                    'calcular_perda', 'passo_treinamento')
+    
+    # Épocas executadas por chamada ao grafo (uma sincronização com o host por bloco)
+    PASSOS_POR_BLOCO = 100
+    
+    # Intervalo, em épocas, entre registros do histórico de perdas
+    INTERVALO_HISTORICO = 10
+    
+    def __init__(self, camadas=[2, 50, 50, 50, 50, 1], learning_rate=0.001, precisao_mista=None,
+                 compilar_xla=None):
+        """
+        Args:
+            camadas: Neurônios por camada, da entrada (S, t) até a saída V
+            learning_rate: Taxa de aprendizado do Adam
+            precisao_mista: Treina as camadas ocultas em float16 (mixed_float16).
+                None ativa automaticamente apenas quando há GPU disponível
+            compilar_xla: Compila o passo de treinamento com XLA, fundindo as
+                pequenas operações da rede em poucos kernels. None ativa
+                automaticamente apenas quando há GPU (no CPU o XLA tende a ser
+                mais lento)
+        """
+        _importar_tensorflow()
+        
+        tem_gpu = bool(tf.config.list_physical_devices('GPU'))
+        if precisao_mista is None:
+            precisao_mista = tem_gpu
+        if compilar_xla is None:
+            compilar_xla = tem_gpu
+        self.precisao_mista = precisao_mista
+        self.compilar_xla = compilar_xla
+        
+        for nome in self._METODOS_GRAFO:
+            jit = compilar_xla and nome in self._METODOS_XLA
+            setattr(self, nome, tf.function(getattr(self, nome), jit_compile=jit))
+        
         self.camadas = camadas
         self.learning_rate = learning_rate
-        self.modelo = self._construir_modelo()
+        self.pesos, self.vieses = self._construir_modelo()
+        self.variaveis_treinaveis = self.pesos + self.vieses
         self.otimizador = tf.keras.optimizers.Adam(learning_rate=learning_rate)
+        if self.precisao_mista:
+            # Escala a perda para evitar underflow dos gradientes em float16
+            self.otimizador = tf.keras.mixed_precision.LossScaleOptimizer(self.otimizador)
         
         # Histórico de perdas
         self.historico_loss = []
@@ -39,54 +96,69 @@ class RedeNeuralPINN:
         self.T = None
         
     def _construir_modelo(self):
-        """Constrói a arquitetura da rede neural"""
-        modelo = tf.keras.Sequential()
+        """
+        Cria os pesos da rede densa como tf.Variables
+        
+        A rede é pequena, então a propagação é feita direto com tf.matmul em
+        _forward, sem o custo por chamada das camadas Keras.
+        """
+        pesos = []
+        vieses = []
         
-        # Camada de entrada (S, t)
-        modelo.add(tf.keras.layers.InputLayer(input_shape=(2,)))
+        pares = list(zip(self.camadas[:-1], self.camadas[1:]))
+        for indice, (entrada, saida) in enumerate(pares):
+            # Ocultas com Glorot normal; saída com Glorot uniforme (padrão do Dense)
+            if indice < len(pares) - 1:
+                inicializador = tf.keras.initializers.GlorotNormal()
+            else:
+                inicializador = tf.keras.initializers.GlorotUniform()
+            
+            pesos.append(tf.Variable(inicializador((entrada, saida)), name=f'W{indice}'))
+            vieses.append(tf.Variable(tf.zeros((saida,)), name=f'b{indice}'))
         
+        return pesos, vieses
+    
+    def _forward(self, inputs):
+        """Propagação direta da rede: V(S, t)"""
         # Camada de normalização (importante para PINNs)
-        modelo.add(tf.keras.layers.Lambda(lambda x: 2.0 * (x - 0.0) / (1.0 - 0.0) - 1.0))
+        h = 2.0 * (inputs - 0.0) / (1.0 - 0.0) - 1.0
         
-        # Camadas ocultas densas com ativação tanh (suave e diferenciável)
-        for neuronios in self.camadas[1:-1]:
-            modelo.add(tf.keras.layers.Dense(
-                neuronios, 
-                activation='tanh',
-                kernel_initializer='glorot_normal'
-            ))
+        # Camadas ocultas densas com ativação tanh (suave e diferenciável),
+        # em float16 quando a precisão mista está ativa (pesos mestres em float32)
+        dtype_ocultas = tf.float16 if self.precisao_mista else tf.float32
+        h = tf.cast(h, dtype_ocultas)
+        for W, b in zip(self.pesos[:-1], self.vieses[:-1]):
+            h = tf.tanh(tf.matmul(h, tf.cast(W, dtype_ocultas)) + tf.cast(b, dtype_ocultas))
         
         # Camada de saída (V - Preço da Opção)
-        # Ativação softplus garante que o preço seja positivo
-        modelo.add(tf.keras.layers.Dense(1, activation='softplus'))
-        
-        return modelo
+        # Ativação softplus garante que o preço seja positivo; fica sempre em
+        # float32 para que as perdas e derivadas sejam acumuladas em float32
+        h = tf.cast(h, tf.float32)
+        return tf.nn.softplus(tf.matmul(h, self.pesos[-1]) + self.vieses[-1])
     
-    @tf.function
     def calcular_derivadas(self, S, t):
         """Calcula as derivadas necessárias para a EDP usando diferenciação automática"""
-        with tf.GradientTape(persistent=True) as tape2:
-            tape2.watch(S)
-            tape2.watch(t)
-            
-            with tf.GradientTape(persistent=True) as tape1:
-                tape1.watch(S)
-                tape1.watch(t)
+        # Fitas aninhadas e não persistentes (o XLA não lida bem com fitas
+        # persistentes): a externa grava o cálculo das primeiras derivadas
+        # para obter a segunda
+        with tf.GradientTape() as tape_externa:
+            tape_externa.watch(S)
+            with tf.GradientTape() as tape:
+                tape.watch(S)
+                tape.watch(t)
                 
                 # Input concatenado para o modelo
                 inputs = tf.stack([S, t], axis=1)
-                V = self.modelo(inputs)
-            
-            # Primeiras derivadas
-            dV_dS = tape1.gradient(V, S)
-            dV_dt = tape1.gradient(V, t)
+                V = self._forward(inputs)
             
+            # Primeiras derivadas (um único backward para S e t)
+            dV_dS, dV_dt = tape.gradient(V, [S, t])
+        
         # Segunda derivada
-        d2V_dS2 = tape2.gradient(dV_dS, S)
+        d2V_dS2 = tape_externa.gradient(dV_dS, S)
         
         return V, dV_dt, dV_dS, d2V_dS2
     
-    @tf.function
     def calcular_perda_pde(self, S, t):
         """
         Calcula o resíduo da EDP de Black-Scholes:
@@ -100,7 +172,6 @@ class RedeNeuralPINN:
                   
         return tf.reduce_mean(tf.square(residuo))
     
-    @tf.function
     def calcular_perda(self, S_colocacao, t_colocacao, 
                        S_inicial, t_inicial, V_inicial,
                        S_contorno_inf, t_contorno_inf, V_contorno_inf,
@@ -110,19 +181,25 @@ class RedeNeuralPINN:
         # 1. Perda da EDP (Physics Loss) nos pontos de colocação
         loss_pde = self.calcular_perda_pde(S_colocacao, t_colocacao)
         
-        # 2. Perda da Condição Inicial/Terminal (Payoff em t=T)
+        # 2 e 3. Condição terminal e condições de contorno avaliadas em um único
+        # forward: os três lotes (S, t) são concatenados e a saída é repartida
         # Nota: Em BS, a condição "inicial" para a EDP é no vencimento T
-        inputs_inicial = tf.stack([S_inicial, t_inicial], axis=1)
-        V_pred_inicial = self.modelo(inputs_inicial)
+        inputs_borda = tf.concat([
+            tf.stack([S_inicial, t_inicial], axis=1),
+            tf.stack([S_contorno_inf, t_contorno_inf], axis=1),
+            tf.stack([S_contorno_sup, t_contorno_sup], axis=1),
+        ], axis=0)
+        V_pred_borda = self._forward(inputs_borda)
+        V_pred_inicial, V_pred_inf, V_pred_sup = tf.split(
+            V_pred_borda,
+            [tf.shape(S_inicial)[0], tf.shape(S_contorno_inf)[0], tf.shape(S_contorno_sup)[0]],
+            axis=0)
+        
+        # Perda da Condição Inicial/Terminal (Payoff em t=T)
         loss_ic = tf.reduce_mean(tf.square(V_inicial - V_pred_inicial))
         
-        # 3. Perda das Condições de Contorno (S=0 e S=Smax)
-        inputs_inf = tf.stack([S_contorno_inf, t_contorno_inf], axis=1)
-        V_pred_inf = self.modelo(inputs_inf)
+        # Perdas das Condições de Contorno (S=0 e S=Smax)
         loss_bc_inf = tf.reduce_mean(tf.square(V_contorno_inf - V_pred_inf))
-        
-        inputs_sup = tf.stack([S_contorno_sup, t_contorno_sup], axis=1)
-        V_pred_sup = self.modelo(inputs_sup)
         loss_bc_sup = tf.reduce_mean(tf.square(V_contorno_sup - V_pred_sup))
         
         loss_bc = loss_bc_inf + loss_bc_sup
@@ -133,46 +210,93 @@ class RedeNeuralPINN:
         
         return loss_total, loss_pde, loss_ic, loss_bc
     
-    @tf.function
     def passo_treinamento(self, *args):
         """Executa um passo de otimização"""
         with tf.GradientTape() as tape:
             loss_total, loss_pde, loss_ic, loss_bc = self.calcular_perda(*args)
+            loss_otimizada = loss_total
+            if self.precisao_mista:
+                loss_otimizada = self._escalar_perda(loss_total)
             
-        gradientes = tape.gradient(loss_total, self.modelo.trainable_variables)
-        self.otimizador.apply_gradients(zip(gradientes, self.modelo.trainable_variables))
+        gradientes = tape.gradient(loss_otimizada, self.variaveis_treinaveis)
+        if self.precisao_mista:
+            gradientes = self._desescalar_gradientes(gradientes)
+        self.otimizador.apply_gradients(zip(gradientes, self.variaveis_treinaveis))
         
         return loss_total, loss_pde, loss_ic, loss_bc
+    
+    def treinar_k_passos(self, k, *args):
+        """
+        Executa k passos de otimização dentro de um único grafo
+        
+        As perdas de cada INTERVALO_HISTORICO passos são acumuladas em um
+        TensorArray e devolvidas juntas, como um tensor (registros, 4) com
+        total, PDE, IC e BC.
+        """
+        intervalo = self.INTERVALO_HISTORICO
+        num_registros = (k + intervalo - 1) // intervalo
+        historico = tf.TensorArray(tf.float32, size=num_registros)
+        
+        # Laços aninhados em vez de um condicional por passo dentro do while_loop
+        for i in tf.range(num_registros):
+            perdas = self.passo_treinamento(*args)
+            historico = historico.write(i, tf.stack(perdas))
+            
+            for _ in tf.range(tf.minimum(intervalo, k - i * intervalo) - 1):
+                self.passo_treinamento(*args)
+        
+        return historico.stack()
+
+    def reamostrar_colocacao(self, S_col, t_col, S_max):
+        """Sorteia novos pontos de colocação direto nas variáveis (sem sair do grafo)"""
+        S_col.assign(tf.random.uniform(tf.shape(S_col), minval=0.1, maxval=S_max, dtype=tf.float32))
+        t_col.assign(tf.random.uniform(tf.shape(t_col), minval=0, maxval=self.T, dtype=tf.float32))
+
+    def _escalar_perda(self, loss):
+        """Multiplica a perda pelo fator do LossScaleOptimizer (Keras 2 e 3)"""
+        if hasattr(self.otimizador, 'get_scaled_loss'):
+            return self.otimizador.get_scaled_loss(loss)
+        return self.otimizador.scale_loss(loss)
+    
+    def _desescalar_gradientes(self, gradientes):
+        """Remove o fator de escala dos gradientes (no Keras 3 o apply_gradients já o faz)"""
+        if hasattr(self.otimizador, 'get_unscaled_gradients'):
+            return self.otimizador.get_unscaled_gradients(gradientes)
+        return gradientes
 
     def gerar_dados_treinamento(self, N_colocacao, N_borda, S_max):
         """Gera pontos aleatórios para treinamento"""
+        # Todos os tempos uniformes em [0, T) saem de um único sorteio:
+        # colocação, contorno inferior e contorno superior
+        t_col, t_bc_inf, t_bc_sup = tf.split(
+            tf.random.uniform((N_colocacao + 2 * N_borda,), minval=0, maxval=self.T, dtype=tf.float32),
+            [N_colocacao, N_borda, N_borda])
+        
         # Pontos de Colocação (Domínio interno)
         S_col = tf.random.uniform((N_colocacao,), minval=0.1, maxval=S_max, dtype=tf.float32)
-        t_col = tf.random.uniform((N_colocacao,), minval=0, maxval=self.T, dtype=tf.float32)
         
         # Condição Terminal (t=T, Payoff)
         S_ic = tf.random.uniform((N_borda,), minval=0, maxval=S_max, dtype=tf.float32)
-        t_ic = tf.ones((N_borda,), dtype=tf.float32) * self.T
+        t_ic = tf.fill((N_borda,), tf.constant(self.T, dtype=tf.float32))
         V_ic = tf.maximum(S_ic - self.K, 0)  # Payoff Call Option
         V_ic = tf.reshape(V_ic, (-1, 1))
         
         # Condição de Contorno Inferior (S=0)
         S_bc_inf = tf.zeros((N_borda,), dtype=tf.float32)
-        t_bc_inf = tf.random.uniform((N_borda,), minval=0, maxval=self.T, dtype=tf.float32)
         V_bc_inf = tf.zeros((N_borda, 1), dtype=tf.float32) # Call vale 0 se S=0
         
         # Condição de Contorno Superior (S=S_max)
-        S_bc_sup = tf.ones((N_borda,), dtype=tf.float32) * S_max
-        t_bc_sup = tf.random.uniform((N_borda,), minval=0, maxval=self.T, dtype=tf.float32)
-        # V ≈ S - K*e^(-r(T-t)) para S muito grande (Call)
-        V_bc_sup = S_bc_sup - self.K * tf.exp(-self.r * (self.T - t_bc_sup))
+        S_bc_sup = tf.fill((N_borda,), tf.constant(S_max, dtype=tf.float32))
+        # V ≈ S - K*e^(-r(T-t)) para S muito grande (Call); S é a constante S_max
+        V_bc_sup = S_max - self.K * tf.exp(-self.r * (self.T - t_bc_sup))
         V_bc_sup = tf.reshape(V_bc_sup, (-1, 1))
         
         return (S_col, t_col, S_ic, t_ic, V_ic, 
                 S_bc_inf, t_bc_inf, V_bc_inf, 
                 S_bc_sup, t_bc_sup, V_bc_sup)
 
-    def treinar(self, K, T, r, sigma, epocas=2000, N_colocacao=5000, N_borda=500, callback_progresso=None):
+    def treinar(self, K, T, r, sigma, epocas=2000, N_colocacao=5000, N_borda=500, callback_progresso=None,
+                reamostrar_a_cada=100):
         """
         Treina a PINN para os parâmetros especificados
         
@@ -183,7 +307,15 @@ class RedeNeuralPINN:
             sigma: Volatilidade
             epocas: Número de iterações de treinamento
             callback_progresso: Função para atualizar barra de progresso na GUI
+            reamostrar_a_cada: Épocas entre sorteios de novos pontos de colocação;
+                deve ser múltiplo de PASSOS_POR_BLOCO, pois o sorteio acontece no
+                início de um bloco (None ou 0 mantém os pontos fixos); outros
+                valores levantam ValueError
         """
+        if reamostrar_a_cada and reamostrar_a_cada % self.PASSOS_POR_BLOCO != 0:
+            raise ValueError(f"reamostrar_a_cada ({reamostrar_a_cada}) deve ser múltiplo de "
+                             f"{self.PASSOS_POR_BLOCO} (passos por bloco de treinamento)")
+        
         self.K = float(K)
         self.T = float(T)
         self.r = float(r)
@@ -192,29 +324,43 @@ class RedeNeuralPINN:
         S_max = 4.0 * K  # Domínio espacial suficiente
         
         # Gera dados (fixos para todo o treinamento ou reamostrados periodicamente)
-        dados = self.gerar_dados_treinamento(N_colocacao, N_borda, S_max)
+        dados = list(self.gerar_dados_treinamento(N_colocacao, N_borda, S_max))
+        
+        # Pontos de colocação em variáveis pré-alocadas, reamostradas no próprio grafo
+        S_col = tf.Variable(dados[0], trainable=False)
+        t_col = tf.Variable(dados[1], trainable=False)
+        dados[0], dados[1] = S_col, t_col
         
         inicio = time.time()
         
-        for epoca in range(epocas):
-            loss_total, loss_pde, loss_ic, loss_bc = self.passo_treinamento(*dados)
+        for epoca in range(0, epocas, self.PASSOS_POR_BLOCO):
+            if reamostrar_a_cada and epoca > 0 and epoca % reamostrar_a_cada == 0:
+                self.reamostrar_colocacao(S_col, t_col, S_max)
+            
+            # k como tensor: o último bloco (menor) não provoca novo tracing
+            passos = tf.constant(min(self.PASSOS_POR_BLOCO, epocas - epoca))
             
-            # Registra histórico
-            if epoca % 10 == 0:
-                self.historico_loss.append(loss_total.numpy())
-                self.historico_loss_pde.append(loss_pde.numpy())
-                self.historico_loss_ic.append(loss_ic.numpy())
-                self.historico_loss_bc.append(loss_bc.numpy())
+            # Uma única cópia para o host por bloco, com todos os registros
+            registros = self.treinar_k_passos(passos, *dados).numpy()
+            
+            for indice, (loss_total, loss_pde, loss_ic, loss_bc) in enumerate(registros):
+                epoca_registro = epoca + indice * self.INTERVALO_HISTORICO
                 
-                # Callback para GUI
-                if callback_progresso:
-                    progresso = (epoca + 1) / epocas
-                    msg = f"Época {epoca}/{epocas} - Loss: {loss_total:.6f}"
-                    callback_progresso(progresso, msg)
+                # Registra histórico
+                self.historico_loss.append(loss_total)
+                self.historico_loss_pde.append(loss_pde)
+                self.historico_loss_ic.append(loss_ic)
+                self.historico_loss_bc.append(loss_bc)
                 
                 # Log no console ocasionalmente
-                if epoca % 500 == 0:
-                    print(f"Época {epoca}: Loss Total = {loss_total:.6f} (PDE={loss_pde:.6f}, IC={loss_ic:.6f}, BC={loss_bc:.6f})")
+                if epoca_registro % 500 == 0:
+                    print(f"Época {epoca_registro}: Loss Total = {loss_total:.6f} (PDE={loss_pde:.6f}, IC={loss_ic:.6f}, BC={loss_bc:.6f})")
+            
+            # Callback para GUI (uma vez por bloco, com o último registro)
+            if callback_progresso:
+                progresso = (epoca_registro + 1) / epocas
+                msg = f"Época {epoca_registro}/{epocas} - Loss: {loss_total:.6f}"
+                callback_progresso(progresso, msg)
         
         tempo_total = time.time() - inicio
         print(f"Treinamento concluído em {tempo_total:.2f} segundos.")
@@ -234,7 +380,7 @@ class RedeNeuralPINN:
             t = tf.ones_like(S) * t
             
         inputs = tf.stack([S, t], axis=1)
-        return self.modelo(inputs).numpy().flatten()
+        return self._forward(inputs).numpy().ravel()
 
 
 if __name__ == "__main__":
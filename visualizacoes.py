@@ -2,15 +2,103 @@
 Módulo de visualizações para a Calculadora PINN + Black-Scholes
 Gera gráficos 2D e 3D comparativos e de análise
 """
+import matplotlib
+# Backend não interativo: as figuras são montadas pela API OO e a interface
+# desenha com seu próprio canvas (FigureCanvasTkAgg)
+matplotlib.use('Agg', force=True)
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import Normalize
 from matplotlib.figure import Figure
-from mpl_toolkits.mplot3d import Axes3D
+from matplotlib.lines import Line2D
+from matplotlib.patches import Polygon
 import numpy as np
-import matplotlib.cm as cm
 
 # Configuração de estilo
 plt.style.use('dark_background')
 
+# Eixos 3D e a barra de cores copiam grade, linhas e fundo do rcParams ao serem
+# criados: guardam o visual do tema escuro, sem a grade discreta dos gráficos 2D
+_ESTILO_3D = {chave: plt.rcParams[chave]
+              for chave in ('axes.facecolor', 'axes.edgecolor', 'axes.grid',
+                            'grid.color', 'grid.linestyle', 'grid.alpha')}
+
+# Tema aplicado uma vez aqui, em vez de a cada figura em criar_figura
+plt.rcParams.update({
+    'axes.facecolor': '#1e1e2e',
+    'figure.facecolor': '#1e1e2e',
+    'xtick.color': '#ffffff',
+    'ytick.color': '#ffffff',
+    'axes.edgecolor': '#333333',
+    'grid.color': '#333333',
+    'grid.linestyle': '--',
+    'grid.alpha': 0.3,
+    'axes.grid': True,
+    # Curvas longas (perda, erro): simplificação de até 1 px e caminhos do
+    # Agg quebrados em blocos de 10000 vértices
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
+})
+
+def _float32(dados):
+    """Array contíguo em float32 (precisão que o Agg já usa para desenhar)"""
+    return np.ascontiguousarray(dados, dtype=np.float32)
+
+
+def _vertices_area(x, y):
+    """
+    Vértices (N + 2, 2) em float32 da área entre y >= 0 e o eixo, num único
+    contorno fechado: (x0, 0), (x_i, y_i)..., (xN, 0)
+    """
+    vertices = np.empty((x.size + 2, 2), dtype=np.float32)
+    vertices[1:-1, 0] = x
+    vertices[1:-1, 1] = y
+    vertices[0] = (x[0], 0)
+    vertices[-1] = (x[-1], 0)
+    return vertices
+
+
+def _envelope_min_max(y, alvo=2000):
+    """
+    Reduz uma série longa ao envelope mínimo/máximo de blocos consecutivos
+    
+    Séries com até 2 * `alvo` pontos voltam inteiras. Acima disso, cada bloco
+    vira dois pontos (mínimo e máximo) no x do início do bloco, o que mantém
+    os picos visíveis com O(alvo) vértices em vez de um por época.
+    
+    Returns:
+        Tupla (x, y)
+    """
+    n = y.size
+    if n <= 2 * alvo:
+        return np.arange(n), y
+    
+    inicios = np.arange(0, n, n // alvo)
+    envelope = np.stack([np.minimum.reduceat(y, inicios),
+                         np.maximum.reduceat(y, inicios)], axis=1).ravel()
+    return np.repeat(inicios, 2), envelope
+
+
+def _preencher_vertices(vertices, S_mesh, T_mesh, V_mesh):
+    """
+    Escreve a malha em `vertices`, buffer contíguo (linhas * colunas, 3) em
+    float32, uma coordenada por coluna (S e T esparsos são expandidos aqui)
+    """
+    malha = vertices.reshape(V_mesh.shape + (3,))
+    for eixo, coordenada in enumerate((S_mesh, T_mesh, V_mesh)):
+        malha[..., eixo] = coordenada
+
+
+def _indices_quadrilateros(linhas, colunas):
+    """
+    Índices (Q, 4) dos vértices de cada quadrilátero de uma malha, na mesma
+    ordem usada pelo plot_surface com rstride=cstride=1
+    """
+    base = (np.arange(linhas - 1)[:, np.newaxis] * colunas + np.arange(colunas - 1)).ravel()
+    return np.stack([base, base + 1, base + colunas + 1, base + colunas], axis=1)
+
+
 class Visualizador:
     """Gerencia a criação de gráficos e visualizações"""
     
@@ -23,46 +111,159 @@ class Visualizador:
             'terciaria': '#81c784',
             'grid': '#333333'
         }
+        
+        # Propriedades das curvas da comparação 2D, montadas uma vez
+        self._props_linha_analitico = {'color': self.cores['primaria'], 'linewidth': 2,
+                                       'linestyle': '-', 'label': 'Black-Scholes (Analítico)'}
+        self._props_linha_pinn = {'color': self.cores['secundaria'], 'linewidth': 2,
+                                  'linestyle': '--', 'label': 'PINN (Rede Neural)'}
+        
+        # Figuras informadas pelo chamador já montadas: (tipo, fig) -> (fig, eixo(s), artistas)
+        self._fig_cache = {}
+        
+        # Buffer reaproveitado por calcular_e_plotar_erro
+        self._erro_buf = None
+        
+        # Fundo e limites guardados por atualizar_grafico_loss
+        self._blit_loss = None
+        # Figura -> conexão do draw_event que refaz o fundo do blit
+        self._conexoes_blit = {}
+    
+    def _figura_em_cache(self, chave):
+        """
+        Devolve a entrada em cache de `chave` se ainda puder ser atualizada
+        
+        Só figuras informadas pelo chamador entram no cache: sem `fig`, cada
+        chamada cria uma figura nova, que o chamador pode guardar sem vê-la
+        ser sobrescrita. A entrada vale enquanto seus eixos continuam na
+        figura: uma figura compartilhada é limpa quando outro tipo de gráfico
+        é desenhado nela.
+        """
+        if chave[1] is None:
+            return None
+        entrada = self._fig_cache.get(chave)
+        if entrada is None:
+            return None
+        
+        fig_cache, eixos, _ = entrada
+        eixo = eixos[0] if isinstance(eixos, list) else eixos
+        return entrada if eixo in fig_cache.axes else None
+    
+    def montar_grade(self, S_vec, T_vec):
+        """
+        Grade esparsa (S em colunas, T em linhas) equivalente a np.meshgrid
+        
+        Devolve S com formato (1, N) e T com formato (M, 1): as funções de
+        preço e o plot_surface fazem o broadcast, sem materializar as duas
+        matrizes M x N intermediárias.
+        """
+        S_vec = np.asarray(S_vec)
+        T_vec = np.asarray(T_vec)
+        return S_vec[np.newaxis, :], T_vec[:, np.newaxis]
     
     def criar_figura(self, tamanho=(8, 6), dpi=100, 
-                    projecao_3d=False):
-        """Cria uma figura matplotlib configurada para o tema"""
-        fig = Figure(figsize=tamanho, dpi=dpi)
-        fig.patch.set_facecolor(self.cores['fundo'])
+                    projecao_3d=False, fig=None):
+        """
+        Cria uma figura matplotlib configurada para o tema
+        
+        Se `fig` for informada, ela é limpa e reutilizada (ex.: figura
+        persistente de um canvas Tk) em vez de criar uma nova. Figuras novas
+        recebem um canvas Agg, então savefig/draw não passam por GUI.
+        """
+        if fig is None:
+            fig = Figure(figsize=tamanho, dpi=dpi)
+            FigureCanvasAgg(fig)
+        else:
+            fig.clf()
         
+        # Cores de fundo, ticks, bordas e grade vêm do rcParams do módulo
         if projecao_3d:
-            ax = fig.add_subplot(111, projection='3d')
+            with plt.rc_context(_ESTILO_3D):
+                ax = fig.add_subplot(111, projection='3d')
             ax.set_facecolor(self.cores['fundo'])
             # Cores dos painéis 3D
-            ax.w_xaxis.set_pane_color((0.15, 0.15, 0.2, 1.0))
-            ax.w_yaxis.set_pane_color((0.15, 0.15, 0.2, 1.0))
-            ax.w_zaxis.set_pane_color((0.15, 0.15, 0.2, 1.0))
+            ax.xaxis.set_pane_color((0.15, 0.15, 0.2, 1.0))
+            ax.yaxis.set_pane_color((0.15, 0.15, 0.2, 1.0))
+            ax.zaxis.set_pane_color((0.15, 0.15, 0.2, 1.0))
         else:
             ax = fig.add_subplot(111)
-            ax.set_facecolor(self.cores['fundo'])
-            ax.grid(True, linestyle='--', alpha=0.3, color=self.cores['grid'])
-            
-        # Configuração comum de eixos
-        ax.tick_params(colors=self.cores['texto'])
-        for spine in ax.spines.values():
-            spine.set_color(self.cores['grid'])
             
         return fig, ax
     
-    def plotar_comparacao_2d(self, S_range, precos_analiticos, precos_pinn, K):
-        """Plota comparação 2D entre modelo analítico e PINN"""
-        fig, ax = self.criar_figura()
+    def _guardar_em_cache(self, chave, entrada):
+        """Guarda a figura montada para `chave`, se ela veio do chamador"""
+        if chave[1] is not None:
+            self._fig_cache[chave] = entrada
+    
+    def fechar(self, fig):
+        """
+        Libera uma figura que não será mais usada
+        
+        Remove do cache as entradas que apontam para ela (o cache é o que
+        mantém vivas as figuras criadas aqui) e limpa seus artistas. Figuras
+        fora do pyplot não têm gerenciador, então a memória volta assim que o
+        chamador soltar a referência. O canvas é mantido: pode ser o de um
+        widget Tk que continua na tela.
+        """
+        self._fig_cache = {chave: entrada for chave, entrada in self._fig_cache.items()
+                           if entrada[0] is not fig}
+        if self._blit_loss is not None and self._blit_loss['chave'] not in self._fig_cache:
+            self._blit_loss = None
+        cid = self._conexoes_blit.pop(fig, None)
+        if cid is not None:
+            fig.canvas.mpl_disconnect(cid)
+        fig.clear()
+    
+    def renderizar_rgba(self, fig):
+        """
+        Desenha a figura e devolve os pixels RGBA (altura, largura, 4)
+        
+        O array é uma view do buffer do Agg, sem codificar PNG; é
+        sobrescrito no próximo desenho da figura (copie se precisar guardar).
+        Para uma imagem PIL: Image.frombuffer('RGBA', (largura, altura),
+        pixels, 'raw', 'RGBA', 0, 1).
+        """
+        canvas = fig.canvas
+        if not isinstance(canvas, FigureCanvasAgg):
+            # Canvas Tk (FigureCanvasTkAgg) já é Agg e é mantido
+            canvas = FigureCanvasAgg(fig)
+        canvas.draw()
+        return np.asarray(canvas.buffer_rgba())
+    
+    def plotar_comparacao_2d(self, S_range, precos_analiticos, precos_pinn, K, fig=None):
+        """
+        Plota comparação 2D entre modelo analítico e PINN
+        
+        Chamadas seguintes com a mesma figura só atualizam os dados das
+        linhas já criadas.
+        """
+        S_range = _float32(S_range)
+        precos_analiticos = _float32(precos_analiticos)
+        precos_pinn = _float32(precos_pinn)
+        
+        chave = ('comparacao_2d', fig)
+        entrada = self._figura_em_cache(chave)
+        if entrada is not None:
+            fig, ax, linhas = entrada
+            linhas['analitico'].set_data(S_range, precos_analiticos)
+            linhas['pinn'].set_data(S_range, precos_pinn)
+            linhas['strike'].set_xdata([K, K])
+            ax.relim()
+            ax.autoscale_view()
+            return fig
+        
+        fig, ax = self.criar_figura(fig=fig)
         
-        ax.plot(S_range, precos_analiticos, '-', 
-               label='Black-Scholes (Analítico)', 
-               color=self.cores['primaria'], linewidth=2)
-               
-        ax.plot(S_range, precos_pinn, '--', 
-               label='PINN (Rede Neural)', 
-               color=self.cores['secundaria'], linewidth=2)
+        # Line2D criadas direto, sem o parse de formato e kwargs do ax.plot
+        linha_analitico = ax.add_line(Line2D(S_range, precos_analiticos,
+                                             **self._props_linha_analitico))
+        linha_pinn = ax.add_line(Line2D(S_range, precos_pinn, **self._props_linha_pinn))
         
-        # Linha do Strike
-        ax.axvline(x=K, color='red', linestyle=':', alpha=0.5, label='Strike (K)')
+        # Linha do Strike: Line2D própria (cor e estilo diferentes das curvas), em
+        # cache como as demais; atualizar K é um set_xdata, sem recriar o artista
+        linha_strike = ax.axvline(x=K, color='red', linestyle=':', alpha=0.5,
+                                  label='Strike (K)')
+        ax.autoscale_view()
         
         ax.set_title('Comparação de Preços: Analítico vs PINN', 
                     color=self.cores['texto'], fontsize=14, pad=15)
@@ -72,28 +273,116 @@ class Visualizador:
         legend = ax.legend(facecolor=self.cores['fundo'], edgecolor=self.cores['grid'])
         plt.setp(legend.get_texts(), color=self.cores['texto'])
         
+        self._guardar_em_cache(chave, (fig, ax, {'analitico': linha_analitico,
+                                                 'pinn': linha_pinn,
+                                                 'strike': linha_strike}))
         return fig
     
-    def plotar_erro_absoluto(self, S_range, erro):
-        """Plota o erro absoluto entre os modelos"""
-        fig, ax = self.criar_figura()
+    def plotar_erro_absoluto(self, S_range, erro, fig=None):
+        """
+        Plota o erro absoluto entre os modelos
         
-        ax.plot(S_range, erro, color='#ef5350', linewidth=2)
-        ax.fill_between(S_range, 0, erro, color='#ef5350', alpha=0.3)
+        A área sob a curva é um único Polygon (o erro é não negativo), que é
+        atualizado com set_xy em vez do PolyCollection do fill_between.
+        """
+        S_range = _float32(S_range)
+        erro = _float32(erro)
+        
+        chave = ('erro_absoluto', fig)
+        entrada = self._figura_em_cache(chave)
+        if entrada is not None:
+            fig, ax, artistas = entrada
+            artistas['linha'].set_data(S_range, erro)
+            artistas['preenchimento'].set_xy(_vertices_area(S_range, erro))
+            ax.relim()
+            ax.autoscale_view()
+            return fig
+        
+        fig, ax = self.criar_figura(fig=fig)
+        
+        linha, = ax.plot(S_range, erro, color='#ef5350', linewidth=2)
+        preenchimento = ax.add_patch(Polygon(_vertices_area(S_range, erro), closed=True,
+                                             color='#ef5350', alpha=0.3))
         
         ax.set_title('Erro Absoluto (|Analítico - PINN|)', 
                     color=self.cores['texto'], fontsize=14)
         ax.set_xlabel('Preço do Ativo (S)', color=self.cores['texto'])
         ax.set_ylabel('Erro Absoluto', color=self.cores['texto'])
         
+        self._guardar_em_cache(chave, (fig, ax, {'linha': linha,
+                                                 'preenchimento': preenchimento}))
         return fig
     
-    def plotar_superficie_3d(self, S_mesh, T_mesh, V_mesh, titulo='Superfície de Preço'):
-        """Plota superfície 3D do preço da opção"""
-        fig, ax = self.criar_figura(projecao_3d=True)
+    def calcular_e_plotar_erro(self, S_range, precos_analiticos, precos_pinn, fig=None):
+        """
+        Calcula |analítico - PINN| em um buffer persistente e plota o erro
+        
+        O buffer (float32, já no formato usado no gráfico) só é realocado
+        quando o tamanho da série muda.
+        """
+        formato = np.shape(precos_analiticos)
+        if self._erro_buf is None or self._erro_buf.shape != formato:
+            self._erro_buf = np.empty(formato, dtype=np.float32)
+        
+        np.subtract(precos_analiticos, precos_pinn, out=self._erro_buf)
+        np.abs(self._erro_buf, out=self._erro_buf)
+        return self.plotar_erro_absoluto(S_range, self._erro_buf, fig=fig)
+    
+    def plotar_superficie_3d(self, S_mesh, T_mesh, V_mesh, titulo='Superfície de Preço',
+                             fig=None, vmin=None, vmax=None, max_pontos=100):
+        """
+        Plota superfície 3D do preço da opção
+        
+        Malhas com mais de `max_pontos` pontos por lado são amostradas com
+        passo fixo (views, sem cópia) e desenhadas com rstride=cstride=1,
+        o caminho de quadriláteros uniformes do plot_surface. A projeção
+        3D continua em Python por polígono; para malhas muito densas, o
+        do_3d_projection do Poly3DCollection pode ser substituído por uma
+        versão vetorizada, mas isso não é feito aqui.
+        
+        Se a malha tiver o mesmo formato da anterior, os vértices e cores da
+        coleção existente são substituídos no lugar, sem recriar figura,
+        eixos e barra de cores.
+        
+        `vmin`/`vmax` fixam a escala de cores (ex.: mesma escala em uma
+        sequência de superfícies); se omitidos, vêm do mínimo e máximo de V.
+        """
+        passo = max(1, max(np.shape(V_mesh)) // max_pontos)
+        S_mesh = _float32(S_mesh)[::passo, ::passo]
+        T_mesh = _float32(T_mesh)[::passo, ::passo]
+        V_mesh = _float32(V_mesh)[::passo, ::passo]
+        if vmin is None:
+            vmin = float(np.min(V_mesh))
+        if vmax is None:
+            vmax = float(np.max(V_mesh))
         
+        chave = ('superficie_3d', fig)
+        entrada = self._figura_em_cache(chave)
+        if entrada is not None and entrada[2]['formato'] == np.shape(V_mesh):
+            fig, ax, artistas = entrada
+            # Buffer de vértices reaproveitado; os polígonos saem de um único gather
+            _preencher_vertices(artistas['vertices'], S_mesh, T_mesh, V_mesh)
+            poligonos = artistas['vertices'][artistas['indices']]
+            media_z = poligonos[..., 2].mean(axis=-1)
+            
+            surf = artistas['superficie']
+            surf.set_verts(poligonos)
+            surf.set_array(media_z)
+            artistas['norma'].vmin, artistas['norma'].vmax = vmin, vmax
+            ax.auto_scale_xyz(S_mesh, T_mesh, V_mesh, had_data=False)
+            ax.set_title(titulo, color=self.cores['texto'], fontsize=14)
+            return fig
+        
+        # Só gráficos 3D precisam do colormap; a projeção '3d' se registra sozinha
+        from matplotlib import cm
+        
+        fig, ax = self.criar_figura(projecao_3d=True, fig=fig)
+        
+        norma = Normalize(vmin, vmax)
         surf = ax.plot_surface(S_mesh, T_mesh, V_mesh, 
                              cmap=cm.viridis,
+                             norm=norma,
+                             rstride=1, cstride=1,
                              linewidth=0, 
                              antialiased=True,
                              alpha=0.8)
@@ -103,18 +392,43 @@ class Visualizador:
         ax.set_ylabel('Tempo (t)', color=self.cores['texto'])
         ax.set_zlabel('Valor Opção (V)', color=self.cores['texto'])
         
-        # Barra de cores
-        cbar = fig.colorbar(surf, ax=ax, shrink=0.5, aspect=10, pad=0.1)
+        # Barra de cores (contorno no estilo 3D, como os eixos)
+        with plt.rc_context(_ESTILO_3D):
+            cbar = fig.colorbar(surf, ax=ax, shrink=0.5, aspect=10, pad=0.1)
         cbar.ax.yaxis.set_tick_params(color=self.cores['texto'])
         plt.setp(plt.getp(cbar.ax.axes, 'yticklabels'), color=self.cores['texto'])
         
+        self._guardar_em_cache(chave, (fig, ax, {'superficie': surf,
+                                                 'norma': norma,
+                                                 'formato': np.shape(V_mesh),
+                                                 'vertices': np.empty((V_mesh.size, 3),
+                                                                      dtype=np.float32),
+                                                 'indices': _indices_quadrilateros(*np.shape(V_mesh))}))
         return fig
     
-    def plotar_historico_treinamento(self, historico_loss):
-        """Plota a evolução da perda durante o treinamento"""
-        fig, ax = self.criar_figura()
+    def plotar_historico_treinamento(self, historico_loss, fig=None):
+        """
+        Plota a evolução da perda durante o treinamento
+        
+        Históricos longos são desenhados pelo envelope mínimo/máximo
+        (ver _envelope_min_max).
+        """
+        epocas, perdas = _envelope_min_max(_float32(historico_loss))
         
-        ax.plot(historico_loss, color=self.cores['terciaria'], linewidth=1.5)
+        chave = ('historico', fig)
+        entrada = self._figura_em_cache(chave)
+        if entrada is not None:
+            fig, ax, linhas = entrada
+            linhas['loss'].set_data(epocas, perdas)
+            # Volta a entrar no desenho normal depois de atualizar_grafico_loss
+            linhas['loss'].set_animated(False)
+            ax.relim()
+            ax.autoscale_view()
+            return fig
+        
+        fig, ax = self.criar_figura(fig=fig)
+        
+        linha, = ax.plot(epocas, perdas, color=self.cores['terciaria'], linewidth=1.5)
         ax.set_yscale('log')
         
         ax.set_title('Convergência do Treinamento (Loss)', 
@@ -122,28 +436,126 @@ class Visualizador:
         ax.set_xlabel('Época', color=self.cores['texto'])
         ax.set_ylabel('Loss (Log Scale)', color=self.cores['texto'])
         
+        self._guardar_em_cache(chave, (fig, ax, {'loss': linha}))
         return fig
     
-    def plotar_gregas(self, S_range, gregas_dict):
-        """Plota as gregas em subplots"""
-        fig = Figure(figsize=(10, 8), dpi=100)
-        fig.patch.set_facecolor(self.cores['fundo'])
+    def atualizar_grafico_loss(self, historico_loss, fig=None):
+        """
+        Atualiza o gráfico de perda durante o treinamento (blit)
+        
+        Só a linha é redesenhada sobre o fundo guardado, sem refazer ticks,
+        rótulos e título. O gráfico completo é refeito (com folga nos
+        limites) na primeira chamada, quando um novo treinamento começa,
+        quando a figura muda de tamanho ou quando a perda sai dos limites.
+        Qualquer outro desenho completo da figura (draw_idle, por exemplo)
+        guarda o fundo de novo e redesenha a linha, que continua visível.
+        Ao fim do treinamento, plotar_historico_treinamento devolve a linha
+        ao desenho normal e reajusta os eixos. Sem `fig` não há figura para
+        guardar o fundo, e o gráfico é apenas plotado numa figura nova.
         
+        Returns:
+            Figura do histórico
+        """
+        if fig is None:
+            return self.plotar_historico_treinamento(historico_loss)
+        
+        epocas, perdas = _envelope_min_max(_float32(historico_loss))
+        chave = ('historico', fig)
+        estado = self._blit_loss
+        entrada = self._figura_em_cache(chave)
+        
+        if (estado is not None and entrada is not None and estado['chave'] == chave
+                and estado['bbox'] == entrada[1].bbox.bounds
+                and len(historico_loss) >= estado['n']
+                and epocas[-1] <= estado['xlim'][1]
+                and estado['ylim'][0] <= perdas.min() and perdas.max() <= estado['ylim'][1]):
+            fig, ax, linhas = entrada
+            fig.canvas.restore_region(estado['fundo'])
+            linhas['loss'].set_data(epocas, perdas)
+            ax.draw_artist(linhas['loss'])
+            fig.canvas.blit(ax.bbox)
+            estado['n'] = len(historico_loss)
+            return fig
+        
+        # Redesenho completo: fundo sem a linha (animated) e limites com folga;
+        # auto=None mantém o autoscale ligado para o gráfico final
+        fig = self.plotar_historico_treinamento(historico_loss, fig=fig)
+        _, ax, linhas = self._fig_cache[chave]
+        linhas['loss'].set_animated(True)
+        
+        ax.set_xlim(0, max(2 * epocas[-1], 10), auto=None)
+        y_min, y_max = ax.get_ylim()
+        ax.set_ylim(y_min / 10, y_max, auto=None)
+        
+        if fig not in self._conexoes_blit:
+            self._conexoes_blit[fig] = fig.canvas.mpl_connect('draw_event',
+                                                              self._redesenhar_fundo_loss)
+        self._blit_loss = {'chave': chave,
+                           'fundo': None,
+                           'bbox': None,
+                           'xlim': ax.get_xlim(),
+                           'ylim': ax.get_ylim(),
+                           'n': len(historico_loss)}
+        # O draw_event guarda o fundo e desenha a linha por cima
+        fig.canvas.draw()
+        return fig
+    
+    def _redesenhar_fundo_loss(self, evento):
+        """
+        Guarda um novo fundo para o blit depois de um desenho completo
+        
+        Chamado pelo draw_event: como a linha é animated, o desenho completo
+        não a inclui, então ela é desenhada aqui por cima do fundo copiado.
+        """
+        estado = self._blit_loss
+        if estado is None:
+            return
+        entrada = self._fig_cache.get(estado['chave'])
+        if entrada is None or entrada[0] is not evento.canvas.figure:
+            return
+        _, ax, linhas = entrada
+        if not linhas['loss'].get_animated():
+            return
+        estado['fundo'] = evento.canvas.copy_from_bbox(ax.bbox)
+        estado['bbox'] = ax.bbox.bounds
+        ax.draw_artist(linhas['loss'])
+    
+    def plotar_gregas(self, S_range, gregas_dict, fig=None):
+        """Plota as gregas em uma grade 2x2 com eixo S compartilhado"""
         gregas_nomes = ['delta', 'gamma', 'vega', 'theta']
+        S_range = _float32(S_range)
+        # Uma linha por grega: (4, N) contíguo em float32
+        valores = _float32(np.stack([gregas_dict[nome] for nome in gregas_nomes]))
+        
+        chave = ('gregas', fig)
+        entrada = self._figura_em_cache(chave)
+        if entrada is not None:
+            fig, eixos, linhas = entrada
+            for ax, linha, y in zip(eixos, linhas, valores):
+                linha.set_data(S_range, y)
+                ax.relim()
+                ax.autoscale_view()
+            fig.tight_layout(pad=3.0)
+            return fig
+        
+        if fig is None:
+            fig = Figure(figsize=(10, 8), dpi=100)
+            FigureCanvasAgg(fig)
+        else:
+            fig.clf()
+        fig.patch.set_facecolor(self.cores['fundo'])
+        
         titulos = ['Delta (Δ)', 'Gamma (Γ)', 'Vega (ν)', 'Theta (Θ)']
         cores = ['#64b5f6', '#81c784', '#ffb74d', '#ba68c8']
         
-        for i, (nome, titulo, cor) in enumerate(zip(gregas_nomes, titulos, cores)):
-            ax = fig.add_subplot(2, 2, i+1)
-            ax.set_facecolor(self.cores['fundo'])
-            ax.grid(True, linestyle='--', alpha=0.3, color=self.cores['grid'])
-            
-            ax.plot(S_range, gregas_dict[nome], color=cor, linewidth=2)
+        # Fundo, bordas, ticks e grade dos quatro eixos vêm do rcParams do módulo
+        eixos = list(fig.subplots(2, 2, sharex=True).flat)
+        
+        linhas = []
+        for ax, y, titulo, cor in zip(eixos, valores, titulos, cores):
             ax.set_title(titulo, color=self.cores['texto'])
-            
-            ax.tick_params(colors=self.cores['texto'])
-            for spine in ax.spines.values():
-                spine.set_color(self.cores['grid'])
+            linhas.extend(ax.plot(S_range, y, color=cor, linewidth=2))
                 
         fig.tight_layout(pad=3.0)
+        self._guardar_em_cache(chave, (fig, eixos, linhas))
         return fig